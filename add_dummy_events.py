@@ -5,29 +5,27 @@ Script to add dummy data to the Events table
 import sys
 import os
 from datetime import date, datetime
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select, insert
 
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.models import Event, Base
-from app.database import engine
+from app.models import Event
+from app.database import SessionLocal
 
 def add_dummy_events():
     """Add dummy events to the database"""
     
-    # Create session
-    SessionLocal = sessionmaker(bind=engine)
+    # Create session from the shared engine's session factory
     db = SessionLocal()
     
     try:
         print("🎪 Adding dummy events to the database...")
         
-        # Check if events already exist
-        existing_events = db.query(Event).count()
-        if existing_events > 0:
-            print(f"ℹ️  Found {existing_events} existing events in the database")
+        # Check if any events already exist (LIMIT 1 probe instead of a full COUNT)
+        has_events = db.execute(select(Event.id).limit(1)).first() is not None
+        if has_events:
+            print("ℹ️  Found existing events in the database")
             response = input("Do you want to add more dummy events? (y/n): ")
             if response.lower() != 'y':
                 print("Cancelled.")
@@ -77,24 +75,25 @@ def add_dummy_events():
             }
         ]
         
-        events_added = 0
-        for event_data in dummy_events:
-            # Check if event with same fotoowl_event_id already exists
-            existing = db.query(Event).filter(
-                Event.fotoowl_event_id == event_data["fotoowl_event_id"]
-            ).first()
-            
-            if not existing:
-                new_event = Event(**event_data)
-                db.add(new_event)
-                events_added += 1
-                print(f"✅ Added event: {event_data['name']}")
-            else:
-                print(f"⚠️  Event with FotoOwl ID {event_data['fotoowl_event_id']} already exists: {existing.name}")
+        # Look up which FotoOwl IDs already exist with a single IN query
+        ids = [event_data["fotoowl_event_id"] for event_data in dummy_events]
+        existing_names = dict(db.execute(
+            select(Event.fotoowl_event_id, Event.name).where(Event.fotoowl_event_id.in_(ids))
+        ).all())
         
-        if events_added > 0:
+        new_events = [e for e in dummy_events if e["fotoowl_event_id"] not in existing_names]
+        skipped = [e for e in dummy_events if e["fotoowl_event_id"] in existing_names]
+        
+        if skipped:
+            print("⚠️  Skipping events that already exist: " + ", ".join(
+                f"{existing_names[e['fotoowl_event_id']]} (FotoOwl ID {e['fotoowl_event_id']})" for e in skipped
+            ))
+        
+        if new_events:
+            # Core bulk INSERT, bypasses the ORM unit-of-work flush
+            db.execute(insert(Event), new_events)
             db.commit()
-            print(f"\n🎉 Successfully added {events_added} new events to the database!")
+            print(f"\n🎉 Successfully added {len(new_events)} new events to the database: " + ", ".join(e["name"] for e in new_events))
         else:
             print("\n ℹ️ No new events were added (all already exist)")
         
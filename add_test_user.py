@@ -4,8 +4,6 @@ Script to add a test user to the database
 """
 import os
 import sys
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from passlib.context import CryptContext
 
 # Load environment variables
@@ -18,7 +16,7 @@ except ImportError:
 
 # Import our models
 from app.models import User
-from app.database import get_db, engine, SessionLocal
+from app.database import SessionLocal
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
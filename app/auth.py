@@ -1,40 +1,145 @@
 from fastapi import HTTPException, status, Depends, Request
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwt, JWTError
 from passlib.context import CryptContext
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from cachetools import TTLCache
 from app.database import get_db
 from app.models import User
+import hashlib
 import secrets
+import threading
 import os
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 security = HTTPBasic()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+basic_security_optional = HTTPBasic(auto_error=False)
+bearer_security = HTTPBearer(auto_error=False)
+# New hashes use argon2id (OWASP-recommended 19 MiB / 2 passes / 1 lane, cheaper
+# to verify than bcrypt at rounds=10); existing bcrypt hashes still verify and
+# are upgraded on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+    bcrypt__rounds=10,
+    deprecated="auto"
+)
+
+# Basic auth re-sends the password on every request, so remember successful
+# verifications for a short time instead of running bcrypt each time.
+# Keys are keyed-blake2b digests of username:password (the key never leaves
+# the process); values are the password hash that was verified, so a
+# password change invalidates the entry.
+_AUTH_CACHE_KEY = secrets.token_bytes(32)
+_auth_cache = TTLCache(maxsize=10000, ttl=60)
+_auth_cache_lock = threading.Lock()
+
+# Password hashing is CPU-bound, so at most one hash per core runs at a time:
+# concurrent logins use every core without oversubscribing them, independently of
+# how many requests are in flight. This is a concurrency limiter, not an offload -
+# hashing runs on the caller's thread (a threadpool thread for sync endpoints and
+# dependencies), which blocks until a slot is free. argon2/bcrypt release the GIL,
+# so those threads hash in parallel.
+_hash_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
 
 # Internal authentication credentials (should be in environment variables)
 INTERNAL_USERNAME = os.getenv("INTERNAL_USERNAME", "internal_service")
 INTERNAL_PASSWORD = os.getenv("INTERNAL_PASSWORD", "internal_secret_key_2024")
 
+# Signed access tokens issued by /login (HMAC-SHA256, no bcrypt per request).
+# There is deliberately no default: a key known from the source would let anyone
+# forge a token for any user, so refuse to start without one. The length check
+# also rejects short guessable placeholders such as "change_me"
+JWT_SECRET_KEY_MIN_BYTES = 32
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+if not JWT_SECRET_KEY:
+    raise RuntimeError("JWT_SECRET_KEY is not set; configure it in SSM (/echoo/JWT_SECRET_KEY) or .env")
+if len(JWT_SECRET_KEY.encode()) < JWT_SECRET_KEY_MIN_BYTES:
+    raise RuntimeError(
+        f"JWT_SECRET_KEY must be a random value of at least {JWT_SECRET_KEY_MIN_BYTES} bytes "
+        "(e.g. openssl rand -hex 32)"
+    )
+JWT_ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_SECONDS = 3600
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a plain password against its hash, blocking the calling thread"""
+    with _hash_slots:
+        return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one is outdated
+    Blocks the calling thread
+    """
+    with _hash_slots:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Get password hash"""
-    return pwd_context.hash(password)
+    """Get password hash, blocking the calling thread"""
+    with _hash_slots:
+        return pwd_context.hash(password)
+
+def _auth_cache_key(username: str, password: str) -> bytes:
+    return hashlib.blake2b(f"{username}:{password}".encode(), digest_size=16, key=_AUTH_CACHE_KEY).digest()
 
 def authenticate_user(db: Session, username: str, password: str) -> User:
     """Authenticate user with username and password"""
-    user = db.query(User).filter(User.username == username).first()
+    user = db.execute(select(User).where(User.username == username)).scalar_one_or_none()
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    
+    cache_key = _auth_cache_key(username, password)
+    with _auth_cache_lock:
+        verified_hash = _auth_cache.get(cache_key)
+    if verified_hash == user.password_hash:
+        return user
+    
+    verified, new_hash = verify_and_update_password(password, user.password_hash)
+    if not verified:
         return False
+    
+    # Transparently migrate bcrypt (or outdated argon2) hashes to the current scheme
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+    
+    with _auth_cache_lock:
+        _auth_cache[cache_key] = user.password_hash
     return user
 
-def get_current_user(credentials: HTTPBasicCredentials = Depends(security), db: Session = Depends(get_db)):
-    """Get current authenticated user"""
-    user = authenticate_user(db, credentials.username, credentials.password)
+def create_access_token(user: User) -> str:
+    """Create a short-lived signed access token for the user"""
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ACCESS_TOKEN_EXPIRE_SECONDS)
+    return jwt.encode({"sub": str(user.id), "exp": expires_at}, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+def get_user_from_token(db: Session, token: str) -> Optional[User]:
+    """Verify an access token and load its user, returns None if the token is invalid or expired"""
+    try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, ValueError):
+        return None
+    return db.get(User, user_id)
+
+def get_current_user(
+    bearer: Optional[HTTPAuthorizationCredentials] = Depends(bearer_security),
+    credentials: Optional[HTTPBasicCredentials] = Depends(basic_security_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Get current authenticated user
+    Accepts a Bearer access token from /login, falls back to basic authentication
+    """
+    user = None
+    if bearer:
+        user = get_user_from_token(db, bearer.credentials)
+    elif credentials:
+        user = authenticate_user(db, credentials.username, credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,6 +166,8 @@ def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -
     try:
         # Check if Authorization header is present
         auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            return get_user_from_token(db, auth_header[7:])
         if not auth_header or not auth_header.startswith("Basic "):
             return None
         
@@ -1,56 +1,132 @@
 import os
-import boto3
-from typing import Dict
+import json
+import stat
+import time
+import logging
+import secrets
+import tempfile
+from functools import lru_cache
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Short-lived on-disk cache so respawned workers don't hit SSM again. The values are
+# secrets, so the cache lives in a private per-user directory and is only trusted
+# when it is a regular file owned by us and unreadable to anyone else
+SSM_CACHE_TTL_SECONDS = 300
+
+# Ownership and permission checks need POSIX uids (and O_NOFOLLOW); elsewhere
+# there is no way to keep the cache private, so it is not used at all
+SSM_DISK_CACHE_ENABLED = hasattr(os, "getuid") and hasattr(os, "O_NOFOLLOW")
+
+def _ssm_cache_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), f"echoo-ssm-{os.getuid()}")
+
+def _is_private(st: os.stat_result) -> bool:
+    return st.st_uid == os.getuid() and st.st_mode & 0o077 == 0
+
+def _private_cache_dir() -> str:
+    """Return the cache directory, creating it with mode 0700; raises OSError if it is not private"""
+    path = _ssm_cache_dir()
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or not _is_private(st):
+        raise OSError(f"SSM cache directory {path} is not a private directory")
+    return path
+
+def _read_ssm_cache(env: str) -> Optional[Dict[str, str]]:
+    """Return cached SSM parameters if the cache file is private and still fresh"""
+    if not SSM_DISK_CACHE_ENABLED:
+        return None
+    try:
+        path = os.path.join(_private_cache_dir(), f"{env}.json")
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd) as f:
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode) or not _is_private(st):
+                logger.warning("Ignoring SSM cache %s: not a private file", path)
+                return None
+            if time.time() - st.st_mtime > SSM_CACHE_TTL_SECONDS:
+                return None
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_ssm_cache(env: str, params: Dict[str, str]) -> None:
+    """Persist SSM parameters, readable by the current user only"""
+    if not SSM_DISK_CACHE_ENABLED:
+        return
+    try:
+        cache_dir = _private_cache_dir()
+        # Write a fresh file and rename it into place, so readers never see a
+        # partial file and no existing file or symlink is ever written through
+        tmp_path = os.path.join(cache_dir, f".{env}.{os.getpid()}.{secrets.token_hex(8)}")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(params, f)
+            os.replace(tmp_path, os.path.join(cache_dir, f"{env}.json"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning("Could not write SSM cache: %s", e)
+
+@lru_cache(maxsize=1)
+def _load_ssm_parameters(env: str) -> Dict[str, str]:
+    """
+    Load parameters from the cache or SSM, memoized for the life of the process
+    Raises on failure, so a failed lookup is not memoized and the next call retries
+    """
+    path = f'/echoo'  # Use /echoo as the path
+    logger.debug("Getting SSM parameters for environment: %s, path: %s", env, path)
+    
+    cached = _read_ssm_cache(env)
+    if cached is not None:
+        logger.info("Loaded %d parameters from SSM cache", len(cached))
+        return cached
+    
+    # boto3 is slow to import, so only pay for it when SSM is actually queried
+    import boto3
+
+    ssm = boto3.client('ssm', 'us-east-2')
+    paginator = ssm.get_paginator('get_parameters_by_path')
+    pages = paginator.paginate(Path=path, Recursive=True, WithDecryption=True)
+    params = [param for page in pages for param in page['Parameters']]
+
+    # Convert to dictionary - extract parameter name after the path prefix
+    # For /echoo/POSTGRES_USER -> POSTGRES_USER
+    ssm_dict = {param['Name'].rsplit('/', 1)[-1]: param['Value'] for param in params}
+        
+    logger.info("Loaded %d parameters from SSM", len(ssm_dict))
+    if ssm_dict:
+        _write_ssm_cache(env, ssm_dict)
+    return ssm_dict
 
 def get_ssm_parameters() -> Dict[str, str]:
     """Get parameters from SSM and return as dictionary"""
     env = os.getenv('ENVIRONMENT', 'prod')
-    path = f'/echoo'  # Use /echoo as the path
-    print(f"Getting SSM parameters for environment: {env}, path: {path}")
-    
     try:
-        ssm = boto3.client('ssm', 'us-east-2')
-        NextToken = '-1'
-        params = []
-        
-        while NextToken:
-            if NextToken == '-1':
-                NextToken = None
-            if NextToken:
-                response = ssm.get_parameters_by_path(
-                    Path=path, 
-                    Recursive=True, 
-                    NextToken=NextToken, 
-                    WithDecryption=True
-                )
-            else:
-                response = ssm.get_parameters_by_path(
-                    Path=path, 
-                    Recursive=True, 
-                    WithDecryption=True
-                )
-
-            NextToken = response.get('NextToken')
-            params.extend(response['Parameters'])
-
-        # Convert to dictionary - extract parameter name after the path prefix
-        # For /echoo/POSTGRES_USER -> POSTGRES_USER
-        ssm_dict = {}
-        for param in params:
-            param_name = param['Name'].split('/')[-1]  # Get last part after final /
-            ssm_dict[param_name] = param['Value']
-            
-        print(f"Loaded {len(ssm_dict)} parameters from SSM")
-        return ssm_dict
+        return _load_ssm_parameters(env)
     except Exception as e:
-        print(f"Warning: Could not fetch SSM parameters: {str(e)}")
+        logger.warning("Could not fetch SSM parameters: %s", e)
         return {}
 
 def set_env(force: bool = False):
     """Set environment variables from SSM with priority over .env"""
+    # Tests run against local settings; skip the SSM round-trip entirely
+    if os.getenv('ENVIRONMENT') == 'test' and not force:
+        logger.debug("Skipping SSM parameters in test environment")
+        return
+
     ssm_params = get_ssm_parameters()
     
     # Update environment with SSM parameters (these will take priority)
-    for key, value in ssm_params.items():
-        os.environ[key] = value
-        print(f"Set environment variable: {key}")
\ No newline at end of file
+    os.environ.update(ssm_params)
+    logger.debug("Set %d environment variables from SSM", len(ssm_params))
\ No newline at end of file
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import os
 
 # PostgreSQL database configuration
@@ -19,8 +20,42 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "fotoowl_db")
 # Construct the database URL
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Connection pool sized for concurrent FastAPI workers; pre-ping drops stale
+# connections after a DB restart and LIFO keeps a small set of connections warm.
+# The larger compiled-statement cache keeps every endpoint's SQL compiled once.
+# executemany batching: INSERTs go out as multi-row VALUES pages and
+# UPDATE/DELETE executemany use psycopg2's execute_batch.
+# Pool limits can be tuned per deployment. Behind PgBouncer in transaction mode,
+# set DB_NULLPOOL=true to let PgBouncer own pooling and open a connection per checkout
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_NULLPOOL = os.getenv("DB_NULLPOOL", "false").lower() == "true"
+
+if DB_NULLPOOL:
+    pool_options = {"poolclass": NullPool}
+else:
+    pool_options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_use_lifo": True
+    }
+
+engine = create_engine(
+    DATABASE_URL,
+    **pool_options,
+    query_cache_size=1200,
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=1000,
+    executemany_batch_page_size=500
+)
+# expire_on_commit=False keeps loaded attributes usable after commit instead of
+# re-SELECTing them the next time a handler or serializer touches the object
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
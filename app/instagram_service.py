@@ -1,10 +1,11 @@
 import aiohttp
 import logging
+import orjson
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models import UserInstaPost
-from app.schemas import InstagramPostCreate
 import os
 
 logger = logging.getLogger(__name__)
@@ -17,24 +18,41 @@ class InstagramService:
             "x-rapidapi-host": "instagram-scraper-stable-api.p.rapidapi.com",
             "x-rapidapi-key": os.environ.get("INSTA_FETCH_KEY")
         }
+        # Created lazily inside the running event loop and reused across calls
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._session: Optional[aiohttp.ClientSession] = None
     
-    def _clean_none_keys(self, data):
+    async def _get_session(self) -> aiohttp.ClientSession:
         """
-        Recursively clean None keys from dictionaries to prevent JSON serialization errors
+        Return the shared HTTP session, creating it on first use
+        The connector keeps connections to the Instagram API alive between calls
+        and caches the DNS lookup for its host
         """
-        if isinstance(data, dict):
-            # Filter out None keys and recursively clean values
-            cleaned = {}
-            for key, value in data.items():
-                if key is not None:
-                    cleaned[key] = self._clean_none_keys(value)
-            return cleaned
-        elif isinstance(data, list):
-            # Recursively clean list items
-            return [self._clean_none_keys(item) for item in data]
-        else:
-            # Return primitive values as-is
-            return data
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit_per_host=10,
+                ttl_dns_cache=600,
+                enable_cleanup_closed=True,
+                keepalive_timeout=75
+            )
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30.0),
+                connector=self._connector,
+                connector_owner=False
+            )
+        return self._session
+    
+    async def close(self):
+        """
+        Close the shared HTTP session and its connector
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+        self._session = None
+        self._connector = None
     
     async def fetch_user_posts(self, instagram_url: str, amount: int = 10) -> Optional[dict]:
         """
@@ -46,22 +64,16 @@ class InstagramService:
                 "amount": str(amount)
             }
             
-            timeout = aiohttp.ClientTimeout(total=30.0)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    self.api_url,
-                    headers=self.headers,
-                    data=data
-                ) as response:
-                    response.raise_for_status()
-                    json_response = await response.json()
-                    
-                    # Validate and clean the response to prevent None key issues
-                    if isinstance(json_response, dict):
-                        # Recursively clean None keys from the response
-                        json_response = self._clean_none_keys(json_response)
-                    
-                    return json_response
+            session = await self._get_session()
+            async with session.post(
+                self.api_url,
+                headers=self.headers,
+                data=data
+            ) as response:
+                response.raise_for_status()
+                # JSON object keys are always strings, so the parsed response
+                # can't contain None keys and needs no extra cleaning pass
+                return orjson.loads(await response.read())
                 
         except aiohttp.ClientError as e:
             logger.error(f"HTTP error fetching Instagram posts: {e}")
@@ -101,28 +113,20 @@ class InstagramService:
                 }
                 
                 # Extract caption text safely
-                if "caption" in node and node["caption"] is not None:
-                    caption_data = node["caption"]
-                    if isinstance(caption_data, dict):
-                        # Check if caption dict has None keys and filter them out
-                        if any(key is None for key in caption_data.keys()):
-                            logger.warning("Found None keys in caption data, filtering them out")
-                            caption_data = {k: v for k, v in caption_data.items() if k is not None}
-                        
-                        if "text" in caption_data and caption_data["text"]:
-                            post_data["caption"] = caption_data["text"]
-                    elif isinstance(caption_data, str):
-                        post_data["caption"] = caption_data
+                caption_data = node.get("caption")
+                if isinstance(caption_data, dict):
+                    text = caption_data.get("text")
+                    if text:
+                        post_data["caption"] = text
+                elif isinstance(caption_data, str):
+                    post_data["caption"] = caption_data
                 
-                # Extract created_at timestamp safely
-                if "taken_at" in node and node["taken_at"] is not None:
-                    post_data["instagram_created_at"] = node["taken_at"]
-                elif ("caption" in node and node["caption"] and 
-                      isinstance(node["caption"], dict) and 
-                      "created_at" in node["caption"]):
-                    caption_data = node["caption"]
-                    if caption_data["created_at"] is not None:
-                        post_data["instagram_created_at"] = caption_data["created_at"]
+                # Extract created_at timestamp safely, falling back to the caption's created_at
+                taken_at = node.get("taken_at")
+                if taken_at is not None:
+                    post_data["instagram_created_at"] = taken_at
+                elif isinstance(caption_data, dict):
+                    post_data["instagram_created_at"] = caption_data.get("created_at")
                 
                 posts.append(post_data)
                 
@@ -133,43 +137,33 @@ class InstagramService:
         
         return posts
     
-    def get_existing_post_codes(self, db: Session, user_id: int) -> set:
-        """
-        Get set of existing post codes for a user
-        """
-        existing_posts = db.query(UserInstaPost.code).filter(
-            UserInstaPost.user_id == user_id
-        ).all()
-        return {post.code for post in existing_posts}
-    
     def save_new_posts(self, db: Session, user_id: int, posts: List[dict]) -> dict:
         """
         Save new Instagram posts to database
+        Posts whose (user_id, code) already exist are skipped by the database
         """
-        existing_codes = self.get_existing_post_codes(db, user_id)
+        rows = [
+            {
+                "user_id": user_id,
+                "caption": post["caption"],
+                "code": post["code"],
+                "instagram_created_at": post["instagram_created_at"]
+            }
+            for post in posts
+        ]
         
         new_posts = []
-        skipped_count = 0
-        
-        for post in posts:
-            if post["code"] not in existing_codes:
-                insta_post = UserInstaPost(
-                    user_id=user_id,
-                    caption=post["caption"],
-                    code=post["code"],
-                    instagram_created_at=post["instagram_created_at"]
-                )
-                new_posts.append(insta_post)
-            else:
-                skipped_count += 1
-        
-        if new_posts:
-            db.add_all(new_posts)
+        if rows:
+            # ON CONFLICT DO NOTHING lets the unique (user_id, code) index do the dedupe,
+            # so we don't have to pull every existing code for the user first
+            # RETURNING plain columns: callers get dicts, not session-bound ORM objects
+            stmt = pg_insert(UserInstaPost).values(rows).on_conflict_do_nothing(
+                index_elements=["user_id", "code"]
+            ).returning(*UserInstaPost.__table__.c)
+            new_posts = [dict(row) for row in db.execute(stmt).mappings()]
             db.commit()
-            
-            # Refresh to get IDs
-            for post in new_posts:
-                db.refresh(post)
+        
+        skipped_count = len(posts) - len(new_posts)
         
         return {
             "total_received": len(posts),
@@ -206,8 +200,9 @@ class InstagramService:
                 "skipped_posts": 0
             }
         
-        # Save new posts
-        result = self.save_new_posts(db, user_id, posts)
+        # Save new posts on a worker thread so the blocking DB round-trip
+        # doesn't stall other requests on the event loop
+        result = await run_in_threadpool(self.save_new_posts, db, user_id, posts)
         
         return {
             "success": True,
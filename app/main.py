@@ -1,23 +1,30 @@
-from fastapi import FastAPI, Request
+from fastapi import APIRouter, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import os
 
 # Load environment variables from AWS SSM first
 from .aws_ssm import set_env
 set_env()
 
-# Fallback to .env for local development
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("Loaded .env file for local development")
-except ImportError:
-    print("python-dotenv not installed, skipping .env file")
+# Fallback to .env for local development; resolved from the project root rather
+# than the working directory, so it is found wherever the app is started from
+DOTENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
+if os.path.exists(DOTENV_PATH):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(DOTENV_PATH)
+        print("Loaded .env file for local development")
+    except ImportError:
+        print("python-dotenv not installed, skipping .env file")
 
+from sqlalchemy import text
 from app.database import engine
 from app.models import Base
 from app.routers import auth, profile, images, events, public_events, fotoowl_request_mapping
-import os
+from app.instagram_service import instagram_service
+from app.pagination import NEXT_CURSOR_HEADER
+from app.responses import ORJSONResponse
 
 # Application configuration (hardcoded non-sensitive settings)
 PROJECT_NAME = "Echoo API"
@@ -25,46 +32,83 @@ PROJECT_VERSION = "1.0.0"
 API_V1_STR = "/api/v1"
 PORT = 8000
 HOST = "0.0.0.0"
+ALLOWED_ORIGINS = frozenset({"http://localhost:3000", "https://app.echoo.ing"})
+
+# Environment-specific settings, read once after SSM/.env have been loaded
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
 app = FastAPI(
     title=PROJECT_NAME,
     description="FastAPI backend for Echoo with event management, authentication, and FotoOwl integration",
-    version=PROJECT_VERSION
+    version=PROJECT_VERSION,
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration - allow all origins for dev environment
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "https://app.echoo.ing"],  # Allow all origins
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,  # Must be False when using allow_origins=["*"]
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
+    max_age=7200,  # Let browsers reuse preflight results (Chromium caps at 2h)
+)
+
+# Single catalog lookup so a fully migrated database skips the per-table
+# CREATE TABLE IF NOT EXISTS checks that create_all issues
+MISSING_TABLES_QUERY = text(
+    "SELECT COUNT(*) FROM information_schema.tables "
+    "WHERE table_schema = current_schema() AND table_name = ANY(:names)"
 )
 
-# Create database tables on startup
-@app.on_event("startup")
-async def startup_event():
-    Base.metadata.create_all(bind=engine)
+def create_missing_tables():
+    """
+    Create database tables only when some of them do not exist yet
+    Called once by the gunicorn master (gunicorn.conf.py) rather than per worker,
+    so workers starting together never race on an empty database
+    """
+    table_names = list(Base.metadata.tables)
+    with engine.connect() as conn:
+        existing = conn.execute(MISSING_TABLES_QUERY, {"names": table_names}).scalar_one()
+    if existing < len(table_names):
+        Base.metadata.create_all(bind=engine)
+
+# Release pooled outbound HTTP connections on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    await instagram_service.close()
 
 # Include routers
-app.include_router(auth.router, prefix=API_V1_STR, tags=["authentication"])
-app.include_router(profile.router, prefix=API_V1_STR, tags=["profile"])
-app.include_router(images.router, prefix=API_V1_STR, tags=["images"])
-app.include_router(events.router, prefix=API_V1_STR, tags=["events"])
-app.include_router(public_events.router, prefix=API_V1_STR, tags=["public-events"])
-app.include_router(fotoowl_request_mapping.router, prefix=API_V1_STR, tags=["fotoowl-request-mapping"])
+# Compose every API router under one prefixed router, then add its routes to the
+# app in one step instead of re-copying and re-analysing them per include_router call.
+# The routes bypass app.include_router, so the orjson default is set here as well
+api_router = APIRouter(
+    prefix=API_V1_STR,
+    default_response_class=ORJSONResponse,
+    dependency_overrides_provider=app
+)
+api_router.include_router(auth.router, tags=["authentication"])
+api_router.include_router(profile.router, tags=["profile"])
+api_router.include_router(images.router, tags=["images"])
+api_router.include_router(events.router, tags=["events"])
+api_router.include_router(public_events.router, tags=["public-events"])
+api_router.include_router(fotoowl_request_mapping.router, tags=["fotoowl-request-mapping"])
+app.router.routes.extend(api_router.routes)
 
 @app.get("/")
 async def root():
     return {"message": f"{PROJECT_NAME} is running", "version": PROJECT_VERSION}
 
+_HEALTH_BODY = {
+    "status": "healthy",
+    "environment": ENVIRONMENT,
+    "service": "echoo-api"
+}
+
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy", 
-        "environment": os.getenv("ENVIRONMENT", "development"),
-        "service": "echoo-api"
-    }
+    return ORJSONResponse(_HEALTH_BODY, headers={"Cache-Control": "no-store"})
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
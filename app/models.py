@@ -1,8 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, func, Date, Float
-from sqlalchemy.ext.declarative import declarative_base
-from pgvector.sqlalchemy import Vector
-
-Base = declarative_base()
+from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, func, Date, Float, Index, Computed
+from pgvector.sqlalchemy import HALFVEC
+from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
@@ -38,11 +36,39 @@ class Image(Base):
     width = Column(Integer, nullable=True)
     description = Column(String(512), nullable=True)
     image_encoding = Column(String(512), nullable=True)
-    description_vector = Column(Vector(512), nullable=True)
-    image_vector = Column(Vector(512), nullable=True)
+    # Half-precision embeddings: half the storage and HNSW index size of vector(512)
+    description_vector = Column(HALFVEC(512), nullable=True)
+    image_vector = Column(HALFVEC(512), nullable=True)
     event_id = Column(Integer, nullable=True)
+    # Preferred URL for serving the image: filecoin_url if available, otherwise fotoowl_url.
+    # TEXT so it never rejects a source URL, whatever length the source columns allow
+    image_url = Column(Text, Computed("COALESCE(NULLIF(filecoin_url, ''), fotoowl_url)", persisted=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_images_user_created_id", "user_id", created_at.desc(), id.desc()),
+        Index(
+            "ix_images_user_event_created_id", "user_id", "event_id", created_at.desc(), id.desc(),
+            postgresql_where=event_id.isnot(None)
+        ),
+        # Approximate nearest-neighbour search on cosine distance (<=>)
+        Index(
+            "idx_images_image_vector_hnsw", image_vector,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"image_vector": "halfvec_cosine_ops"}
+        ),
+        Index(
+            "idx_images_description_vector_hnsw", description_vector,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"description_vector": "halfvec_cosine_ops"}
+        ),
+    )
+    # Fetch server-generated values (updated_at, image_url) with RETURNING on
+    # UPDATE as well as INSERT, instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 class EventRequestMapping(Base):
     __tablename__ = "event_request_mapping"
@@ -54,6 +80,13 @@ class EventRequestMapping(Base):
     user_id = Column(Integer, nullable=False, index=True)
     redirect_url = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Registration lookups filter by user + event (one registration per pair);
+    # listings filter by user ordered by newest first
+    __table_args__ = (
+        Index("uq_erm_user_event", "user_id", "fotoowl_event_id", unique=True),
+        Index("ix_erm_user_created", "user_id", "created_at"),
+    )
 
 class Event(Base):
     __tablename__ = "events"
@@ -87,9 +120,23 @@ class FotoOwlRequestMapping(Base):
     fotoowl_aria_ratio = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Bulk inserts skip existing triplets via ON CONFLICT on the unique index;
+    # per-event listings filter by event and order by index number, which the
+    # same index serves as a prefix scan
+    __table_args__ = (
+        Index(
+            "uq_fotoowl_request_mapping_event_index_request",
+            "fotoowl_event_id", "fotoowl_index_num", "fotoowl_request_id",
+            unique=True
+        ),
+    )
 
 class UserInstaPost(Base):
     __tablename__ = "user_insta_posts"
+    __table_args__ = (
+        Index("uq_user_insta_posts_user_code", "user_id", "code", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
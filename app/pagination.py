@@ -0,0 +1,26 @@
+import base64
+import json
+from typing import Callable, Optional, Tuple, TypeVar
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+# Response header carrying the cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """Encode the (sort value, id) of the last row on a page as an opaque cursor"""
+    value = sort_value.isoformat() if sort_value is not None else None
+    raw = json.dumps([value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, parse_value: Callable[[str], T]) -> Tuple[Optional[T], int]:
+    """Decode a cursor from encode_cursor, parsing the sort value with parse_value"""
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (parse_value(value) if value is not None else None), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
@@ -0,0 +1,24 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+import orjson
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+    Values orjson can't encode natively (e.g. HttpUrl, Decimal) fall back to str
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+def iter_json_array(partitions):
+    """Encode batches of row mappings as one JSON array, yielding a chunk per batch"""
+    yield b"["
+    separator = b""
+    for partition in partitions:
+        yield separator + b",".join(orjson.dumps(dict(mapping)) for mapping in partition)
+        separator = b","
+    yield b"]"
@@ -1,19 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBasicCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
 from app.database import get_db
-from app.schemas import UserLogin, UserCreate, UserProfile, UserLoginResponse
+from app.schemas import UserCreate, UserProfile, UserLoginResponse
 from app.models import User
-from app.auth import authenticate_user, get_password_hash, security
+from app.auth import authenticate_user, get_password_hash, security, create_access_token, ACCESS_TOKEN_EXPIRE_SECONDS
 
 router = APIRouter()
 
 @router.post("/login", response_model=UserLoginResponse)
-async def login(credentials: HTTPBasicCredentials = Depends(security), db: Session = Depends(get_db)):
+def login(credentials: HTTPBasicCredentials = Depends(security), db: Session = Depends(get_db)):
     """
     Login endpoint with basic authentication
     Returns success message with full user profile if credentials are valid
+    The returned access_token can be sent as 'Authorization: Bearer <token>'
+    on subsequent requests instead of basic credentials
     """
+    # Sync handler: FastAPI runs it in the threadpool, so password verification
+    # and DB access never block the event loop
     user = authenticate_user(db, credentials.username, credentials.password)
     if not user:
         raise HTTPException(
@@ -24,17 +29,20 @@ async def login(credentials: HTTPBasicCredentials = Depends(security), db: Sessi
     
     return {
         "message": "login successful",
-        "user": user
+        "user": user,
+        "access_token": create_access_token(user),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_SECONDS
     }
 
 @router.post("/register", response_model=UserProfile)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     Register a new user
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
-    if existing_user:
+    username_taken = db.scalar(select(exists().where(User.username == user_data.username)))
+    if username_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
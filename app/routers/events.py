@@ -1,77 +1,124 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import Integer, and_, any_, bindparam, exists
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from typing import List, Optional, Tuple
+import threading
 import requests
-import tempfile
-import os
-from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from cachetools import TTLCache
+import mimetypes
+from operator import attrgetter
 from app.database import get_db
-from app.schemas import EventRegistrationRequest, EventRegistrationResponse, RegisteredEventResponse, EventMatchedImagesRequest, ImageListResponse, UserEventImageResponse, UserEventImagesListResponse
+from app.schemas import EventRegistrationRequest, EventRegistrationResponse, RegisteredEventResponse, ImageListResponse, UserEventImagesListResponse
 from app.models import EventRequestMapping, User, Event, Image, FotoOwlRequestMapping
 from app.auth import get_current_user, verify_internal_auth
+from app.responses import ORJSONResponse
 
 router = APIRouter()
 
-async def download_image_from_url(image_url: str) -> str:
-    """Download image from URL and return local file path"""
+# Process-wide HTTP session so FotoOwl and selfie downloads reuse pooled
+# keep-alive connections instead of a new TCP+TLS handshake per call
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=100))
+http_session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=100))
+
+# FotoOwl id/key per internal event id; keys change rarely, so a short TTL
+# spares the Events lookup on every registration
+_event_config_cache = TTLCache(maxsize=1024, ttl=300)
+_event_config_cache_lock = threading.Lock()
+
+def get_event_fotoowl_config(db: Session, event_id: int) -> Optional[Tuple[Optional[int], Optional[str]]]:
+    """Return (fotoowl_event_id, fotoowl_event_key) for an event, or None if it doesn't exist"""
+    with _event_config_cache_lock:
+        config = _event_config_cache.get(event_id)
+    if config is not None:
+        return config
+    
+    row = db.query(Event.fotoowl_event_id, Event.fotoowl_event_key).filter(Event.id == event_id).first()
+    if row is None:
+        return None
+    
+    config = (row.fotoowl_event_id, row.fotoowl_event_key)
+    with _event_config_cache_lock:
+        _event_config_cache[event_id] = config
+    return config
+
+# ImageListResponse fields, read off an Image row in one attrgetter call
+IMAGE_LIST_FIELDS = (
+    "id", "name", "user_id", "fotoowl_image_id", "fotoowl_url", "filecoin_url",
+    "filecoin_cid", "size", "height", "width", "description", "image_encoding",
+    "event_id", "image_url", "created_at", "updated_at"
+)
+_get_image_list_values = attrgetter(*IMAGE_LIST_FIELDS)
+
+# Recently downloaded selfies, so retries and registrations for several events
+# don't download the same image again; bounded by total bytes, not entries
+_image_cache = TTLCache(maxsize=64 * 1024 * 1024, ttl=600, getsizeof=lambda entry: len(entry[0]))
+_image_cache_lock = threading.Lock()
+
+def fetch_image_bytes(image_url: str) -> Tuple[bytes, str]:
+    """Download an image (or reuse a recent download) and return its bytes and content type"""
+    with _image_cache_lock:
+        cached = _image_cache.get(image_url)
+    if cached is not None:
+        return cached
+    
     try:
-        response = requests.get(image_url, timeout=30)
+        response = http_session.get(image_url, timeout=30)
         response.raise_for_status()
-        
-        # Create temporary file with proper extension
-        parsed_url = urlparse(image_url)
-        file_extension = os.path.splitext(parsed_url.path)[1] or '.jpg'
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file.write(response.content)
-            return temp_file.name
-            
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to download image: {str(e)}"
         )
+    
+    entry = (response.content, response.headers.get('Content-Type', 'image/jpeg'))
+    with _image_cache_lock:
+        try:
+            _image_cache[image_url] = entry
+        except ValueError:
+            # Single image larger than the whole cache; just don't keep it
+            pass
+    return entry
 
-async def call_fotoowl_api(event_id: int, key: str, image_file_path: str) -> dict:
-    """Call FotoOwl API to create request"""
+def forward_image_to_fotoowl(image_url: str, event_id: int, key: str) -> dict:
+    """Upload an image from its URL to FotoOwl's create-request API"""
+    image_bytes, content_type = fetch_image_bytes(image_url)
+    
     try:
         fotoowl_api_url = "https://dev-api.fotoowl.ai/open/request"
         
-        with open(image_file_path, 'rb') as image_file:
-            files = {
-                'file': image_file
-            }
-            data = {
-                'event_id': str(event_id),
-                'key': str(key)
-            }
-            
-            response = requests.post(
-                fotoowl_api_url,
-                files=files,
-                data=data,
-                timeout=60
-            )
-            
-            response.raise_for_status()
-            return response.json()
-            
+        # File extension follows the served content type so FotoOwl can detect the format
+        mime_type = content_type.split(';', 1)[0].strip()
+        file_name = 'selfie' + (mimetypes.guess_extension(mime_type) or '.jpg')
+        
+        files = {
+            'file': (file_name, image_bytes, content_type)
+        }
+        data = {
+            'event_id': str(event_id),
+            'key': str(key)
+        }
+        
+        response = http_session.post(
+            fotoowl_api_url,
+            files=files,
+            data=data,
+            timeout=60
+        )
+        
+        response.raise_for_status()
+        return response.json()
+        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to call FotoOwl API: {str(e)}"
         )
-    finally:
-        # Clean up temporary file
-        try:
-            if os.path.exists(image_file_path):
-                os.unlink(image_file_path)
-        except:
-            pass
 
 @router.post("/register-event", response_model=EventRegistrationResponse)
-async def register_for_event(
+def register_for_event(
     registration_data: EventRegistrationRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -83,27 +130,32 @@ async def register_for_event(
     Uses user's selfie_url to upload image to FotoOwl API
     """
     
-    # Get event from our Events table using our internal event ID
-    event = db.query(Event).filter(Event.id == registration_data.event_id).first()
-    if not event:
+    # Get event's FotoOwl config from our Events table using our internal event ID
+    event_config = get_event_fotoowl_config(db, registration_data.event_id)
+    if event_config is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Event not found with id {registration_data.event_id}"
         )
     
-    if not event.fotoowl_event_key or not event.fotoowl_event_id:
+    fotoowl_event_id, fotoowl_event_key = event_config
+    if not fotoowl_event_key or not fotoowl_event_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Event is missing FotoOwl configuration (event_key or fotoowl_event_id)"
         )
     
     # Check if user already registered for this event (using fotoowl_event_id)
-    existing_registration = db.query(EventRequestMapping).filter(
-        EventRequestMapping.user_id == current_user.id,
-        EventRequestMapping.fotoowl_event_id == event.fotoowl_event_id
-    ).first()
+    # Cheap index probe so duplicates are rejected before the FotoOwl upload;
+    # the unique index still guards concurrent registrations on insert
+    already_registered = db.query(
+        exists().where(
+            EventRequestMapping.user_id == current_user.id,
+            EventRequestMapping.fotoowl_event_id == fotoowl_event_id
+        )
+    ).scalar()
     
-    if existing_registration:
+    if already_registered:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"User already registered for this event"
@@ -117,14 +169,11 @@ async def register_for_event(
         )
     
     try:
-        # Download image from user's selfie_url
-        image_file_path = await download_image_from_url(current_user.selfie_url)
-        
-        # Call FotoOwl API with event key from database
-        fotoowl_response = await call_fotoowl_api(
-            event.fotoowl_event_id,   # Use fotoowl_event_id from events table
-            event.fotoowl_event_key,  # Use key from events table
-            image_file_path
+        # Forward user's selfie to FotoOwl API with event key from database
+        fotoowl_response = forward_image_to_fotoowl(
+            current_user.selfie_url,
+            fotoowl_event_id,   # Use fotoowl_event_id from events table
+            fotoowl_event_key   # Use key from events table
         )
         
         # Validate FotoOwl API response
@@ -145,18 +194,27 @@ async def register_for_event(
                 detail="Invalid response from FotoOwl API - missing request_id or request_key"
             )
         
-        # Create event request mapping record
-        event_mapping = EventRequestMapping(
-            fotoowl_event_id=event.fotoowl_event_id,  # Use fotoowl_event_id from events table
-            request_id=request_id,
-            request_key=request_key,
-            user_id=current_user.id,
-            redirect_url=redirect_url
-        )
-        
-        db.add(event_mapping)
+        # Create event request mapping record; RETURNING hands back the stored
+        # row (id, created_at) without a refresh SELECT, and nothing if a
+        # concurrent request registered the same user for this event first
+        event_mapping = db.execute(
+            pg_insert(EventRequestMapping).values(
+                fotoowl_event_id=fotoowl_event_id,  # Use fotoowl_event_id from events table
+                request_id=request_id,
+                request_key=request_key,
+                user_id=current_user.id,
+                redirect_url=redirect_url
+            ).on_conflict_do_nothing(
+                index_elements=["user_id", "fotoowl_event_id"]
+            ).returning(EventRequestMapping)
+        ).scalar_one_or_none()
         db.commit()
-        db.refresh(event_mapping)
+        
+        if event_mapping is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User already registered for this event"
+            )
         
         return event_mapping
         
@@ -172,7 +230,7 @@ async def register_for_event(
         )
 
 @router.get("/my-registrations")
-async def get_user_registrations(
+def get_user_registrations(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -186,7 +244,7 @@ async def get_user_registrations(
     return registrations
 
 @router.get("/registration/{event_id}")
-async def get_event_registration(
+def get_event_registration(
     event_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -207,8 +265,12 @@ async def get_event_registration(
     
     return registration
 
-@router.get("/my-registered-events", response_model=List[RegisteredEventResponse])
-async def get_user_registered_events(
+@router.get(
+    "/my-registered-events",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[RegisteredEventResponse]}}
+)
+def get_user_registered_events(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -221,7 +283,6 @@ async def get_user_registered_events(
     # Left join because the event might not exist in our Events table
     query = db.query(
         EventRequestMapping.id.label('registration_id'),
-        EventRequestMapping.fotoowl_event_id,
         EventRequestMapping.request_id,
         EventRequestMapping.request_key,
         EventRequestMapping.redirect_url,
@@ -242,29 +303,37 @@ async def get_user_registered_events(
     
     results = query.all()
     
-    # Convert to response format
-    registered_events = []
-    for result in results:
-        event_data = RegisteredEventResponse(
-            registration_id=result.registration_id,
-            request_id=result.request_id,
-            request_key=result.request_key,
-            redirect_url=result.redirect_url,
-            registration_created_at=result.registration_created_at,
-            event_id=result.event_id,
-            event_name=result.event_name,
-            event_description=result.event_description,
-            event_cover_image_url=result.event_cover_image_url,
-            event_date=result.event_date,
-            fotoowl_event_id=result.fotoowl_event_id,
-            fotoowl_event_key=result.fotoowl_event_key
-        )
-        registered_events.append(event_data)
+    # Convert to response format (plain dicts with the RegisteredEventResponse
+    # fields; rows come straight from our DB so there is nothing to validate)
+    registered_events = [
+        {
+            "registration_id": result.registration_id,
+            "request_id": result.request_id,
+            "request_key": result.request_key,
+            "redirect_url": result.redirect_url,
+            "registration_created_at": result.registration_created_at,
+            "event_id": result.event_id,
+            "event_name": result.event_name,
+            "event_description": result.event_description,
+            "event_cover_image_url": result.event_cover_image_url,
+            "event_cover_image_height": None,
+            "event_cover_image_width": None,
+            "event_location": None,
+            "event_category": None,
+            "event_date": result.event_date,
+            "fotoowl_event_key": result.fotoowl_event_key
+        }
+        for result in results
+    ]
     
-    return registered_events
+    return ORJSONResponse(registered_events)
 
-@router.get("/get-event-matched-image-list", response_model=List[ImageListResponse])
-async def get_event_matched_image_list(
+@router.get(
+    "/get-event-matched-image-list",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[ImageListResponse]}}
+)
+def get_event_matched_image_list(
     event_id: int = Query(..., description="Internal event ID from Events table"),
     page: int = Query(0, ge=0, description="Page number starting from 0"),
     page_size: int = Query(10, ge=-1, description="Number of images per page. Use -1 for all images"),
@@ -287,8 +356,22 @@ async def get_event_matched_image_list(
     - page_size: Number of images per page, -1 for all images
     """
     
-    # Step 1: Get event from Events table using internal event ID
-    event = db.query(Event).filter(Event.id == event_id).first()
+    # Steps 1-2: Get event from Events table using internal event ID together with
+    # the user's registration for it (automatically get request_id) in one query
+    event = db.query(
+        Event.fotoowl_event_id,
+        Event.fotoowl_event_key,
+        EventRequestMapping.request_id,
+        EventRequestMapping.request_key
+    ).outerjoin(
+        EventRequestMapping,
+        and_(
+            EventRequestMapping.fotoowl_event_id == Event.fotoowl_event_id,
+            EventRequestMapping.user_id == current_user.id
+        )
+    ).filter(
+        Event.id == event_id
+    ).first()
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -301,13 +384,7 @@ async def get_event_matched_image_list(
             detail=f"Event is missing FotoOwl configuration (fotoowl_event_id or fotoowl_event_key)"
         )
     
-    # Step 2: Find user's registration for the event (automatically get request_id)
-    registration = db.query(EventRequestMapping).filter(
-        EventRequestMapping.user_id == current_user.id,
-        EventRequestMapping.fotoowl_event_id == event.fotoowl_event_id
-    ).first()
-    
-    if not registration:
+    if event.request_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User is not registered for event {event_id}. Please register first."
@@ -322,11 +399,11 @@ async def get_event_matched_image_list(
             'page': page,
             'page_size': page_size,
             'key': event.fotoowl_event_key,
-            'request_id': registration.request_id,  # Automatically retrieved from registration
-            'request_key': registration.request_key
+            'request_id': event.request_id,  # Automatically retrieved from registration
+            'request_key': event.request_key
         }
         
-        response = requests.get(
+        response = http_session.get(
             fotoowl_api_url,
             params=params,
             timeout=30
@@ -346,15 +423,25 @@ async def get_event_matched_image_list(
         
         if not image_list:
             # Return empty list if no images found
-            return []
+            return ORJSONResponse([])
         
         # Step 4: Match FotoOwl images with our Images table
         # Get FotoOwl image IDs
         fotoowl_image_ids = [img['id'] for img in image_list]
         
         # Find matching images in our database
-        our_images = db.query(Image).filter(
-            Image.fotoowl_image_id.in_(fotoowl_image_ids)
+        # Only load the columns returned below; skips the two 512-dim vectors
+        our_images = db.query(Image).options(
+            load_only(
+                Image.id, Image.name, Image.user_id, Image.fotoowl_image_id,
+                Image.fotoowl_url, Image.filecoin_url, Image.filecoin_cid,
+                Image.size, Image.height, Image.width, Image.description,
+                Image.image_encoding, Image.event_id, Image.image_url,
+                Image.created_at, Image.updated_at
+            )
+        ).filter(
+            # One array parameter keeps the SQL text identical for any page size
+            Image.fotoowl_image_id == any_(bindparam("fotoowl_image_ids", fotoowl_image_ids, type_=ARRAY(Integer)))
         ).all()
         
         # Create a mapping of fotoowl_image_id to our image data
@@ -369,27 +456,8 @@ async def get_event_matched_image_list(
             
             if our_image:
                 # Use our image data with computed image_url
-                image_url = our_image.filecoin_url if our_image.filecoin_url else our_image.fotoowl_url
-                
-                image_dict = {
-                    "id": our_image.id,
-                    "name": our_image.name,
-                    "user_id": our_image.user_id,
-                    "fotoowl_image_id": our_image.fotoowl_image_id,
-                    "fotoowl_url": our_image.fotoowl_url,
-                    "filecoin_url": our_image.filecoin_url,
-                    "filecoin_cid": our_image.filecoin_cid,
-                    "size": our_image.size,
-                    "height": our_image.height,
-                    "width": our_image.width,
-                    "description": our_image.description,
-                    "image_encoding": our_image.image_encoding,
-                    "event_id": our_image.event_id,
-                    "image_url": image_url,  # Computed field
-                    "created_at": our_image.created_at,
-                    "updated_at": our_image.updated_at
-                }
-                response_images.append(ImageListResponse(**image_dict))
+                image_dict = dict(zip(IMAGE_LIST_FIELDS, _get_image_list_values(our_image)))
+                response_images.append(image_dict)
             else:
                 # Create image record from FotoOwl data if not in our database
                 # Use FotoOwl URL as both fotoowl_url and image_url
@@ -414,9 +482,11 @@ async def get_event_matched_image_list(
                     "updated_at": None
                 }
                 
-                response_images.append(ImageListResponse(**image_dict))
+                response_images.append(image_dict)
         
-        return response_images
+        # Rows come from our DB and the FotoOwl response, so skip per-item model
+        # validation and serialize the plain dicts directly
+        return ORJSONResponse(response_images)
         
     except requests.exceptions.RequestException as e:
         raise HTTPException(
@@ -429,8 +499,12 @@ async def get_event_matched_image_list(
             detail=f"Unexpected error: {str(e)}"
         )
 
-@router.get("/internal/get-user-registered-events/{user_id}", response_model=List[RegisteredEventResponse])
-async def get_user_registered_events_internal(
+@router.get(
+    "/internal/get-user-registered-events/{user_id}",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[RegisteredEventResponse]}}
+)
+def get_user_registered_events_internal(
     user_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
@@ -469,32 +543,37 @@ async def get_user_registered_events_internal(
     
     results = query.all()
     
-    # Convert to response format
-    registered_events = []
-    for result in results:
-        event_data = RegisteredEventResponse(
-            registration_id=result.registration_id,
-            request_id=result.request_id,
-            request_key=result.request_key,
-            redirect_url=result.redirect_url,
-            registration_created_at=result.registration_created_at,
-            event_id=result.event_id,
-            event_name=result.event_name,
-            event_description=result.event_description,
-            event_cover_image_url=result.event_cover_image_url,
-            event_cover_image_height=result.event_cover_image_height,
-            event_cover_image_width=result.event_cover_image_width,
-            event_location=result.event_location,
-            event_category=result.event_category,
-            event_date=result.event_date,
-            fotoowl_event_key=result.fotoowl_event_key
-        )
-        registered_events.append(event_data)
+    # Convert to response format (plain dicts with the RegisteredEventResponse
+    # fields; rows come straight from our DB so there is nothing to validate)
+    registered_events = [
+        {
+            "registration_id": result.registration_id,
+            "request_id": result.request_id,
+            "request_key": result.request_key,
+            "redirect_url": result.redirect_url,
+            "registration_created_at": result.registration_created_at,
+            "event_id": result.event_id,
+            "event_name": result.event_name,
+            "event_description": result.event_description,
+            "event_cover_image_url": result.event_cover_image_url,
+            "event_cover_image_height": result.event_cover_image_height,
+            "event_cover_image_width": result.event_cover_image_width,
+            "event_location": result.event_location,
+            "event_category": result.event_category,
+            "event_date": result.event_date,
+            "fotoowl_event_key": result.fotoowl_event_key
+        }
+        for result in results
+    ]
     
-    return registered_events
+    return ORJSONResponse(registered_events)
 
-@router.get("/internal/get-user-event-images/{user_id}", response_model=UserEventImagesListResponse)
-async def get_user_event_images(
+@router.get(
+    "/internal/get-user-event-images/{user_id}",
+    response_class=ORJSONResponse,
+    responses={200: {"model": UserEventImagesListResponse}}
+)
+def get_user_event_images(
     user_id: int,
     event_id_list_str: Optional[str] = Query(None, description="Comma-separated list of event IDs (e.g., '7' or '7,9')"),
     page: int = Query(0, ge=0, description="Page number starting from 0"),
@@ -571,25 +650,25 @@ async def get_user_event_images(
             event_query = event_query.filter(EventRequestMapping.fotoowl_event_id.in_(fotoowl_event_ids_list))
         else:
             # If no matching fotoowl_event_ids found, return empty result
-            return UserEventImagesListResponse(
-                images=[],
-                total_count=0,
-                page=page,
-                page_size=page_size,
-                total_pages=0
-            )
+            return ORJSONResponse({
+                "images": [],
+                "total_count": 0,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": 0
+            })
     
     user_events = event_query.all()
     
     if not user_events:
         # Return empty result if user has no registered events
-        return UserEventImagesListResponse(
-            images=[],
-            total_count=0,
-            page=page,
-            page_size=page_size,
-            total_pages=0
-        )
+        return ORJSONResponse({
+            "images": [],
+            "total_count": 0,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": 0
+        })
     
     # Extract fotoowl_event_ids and request_ids
     fotoowl_event_ids = [event.fotoowl_event_id for event in user_events]
@@ -640,36 +719,13 @@ async def get_user_event_images(
     # Calculate total pages
     total_pages = (total_count + page_size - 1) // page_size
     
-    # Convert to response format
-    images = []
-    for result in results:
-        image_data = UserEventImageResponse(
-            image_id=result.image_id,
-            event_id=result.event_id,
-            fotoowl_request_id=result.fotoowl_request_id,
-            fotoowl_aria_ratio=result.fotoowl_aria_ratio,
-            fotoowl_x1=result.fotoowl_x1,
-            fotoowl_x2=result.fotoowl_x2,
-            fotoowl_y1=result.fotoowl_y1,
-            fotoowl_y2=result.fotoowl_y2,
-            fotoowl_url=result.fotoowl_url,
-            filecoin_url=result.filecoin_url,
-            size=result.size,
-            height=result.height,
-            width=result.width,
-            description=result.description,
-            # Event information
-            event_description=result.event_description,
-            event_event_date=result.event_event_date,
-            event_name=result.event_name,
-            event_location=result.event_location
-        )
-        images.append(image_data)
-    
-    return UserEventImagesListResponse(
-        images=images,
-        total_count=total_count,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    # Rows are labelled to match UserEventImageResponse, so they serialize as plain dicts
+    images = [dict(result._mapping) for result in results]
+    
+    return ORJSONResponse({
+        "images": images,
+        "total_count": total_count,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages
+    })
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import text
-from typing import List
+from sqlalchemy import delete, select, text
+from typing import List, Tuple
+import csv
+import io
 import logging
+import os
 from app.database import get_db
 from app.schemas import (
     FotoOwlRequestMappingCreate, 
@@ -13,14 +16,141 @@ from app.schemas import (
 )
 from app.models import FotoOwlRequestMapping
 from app.auth import verify_internal_auth
+from app.responses import ORJSONResponse, iter_json_array
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/internal/fotoowl-request-mapping/bulk", response_model=FotoOwlRequestMappingBulkResponse)
-async def bulk_insert_fotoowl_request_mappings(
+# Staging table for one bulk request; dropped automatically at commit/rollback
+CREATE_STAGING_SQL = text("""
+    CREATE TEMP TABLE fotoowl_request_mapping_staging (
+        fotoowl_request_id INTEGER NOT NULL,
+        fotoowl_event_id INTEGER NOT NULL,
+        fotoowl_image_id INTEGER NOT NULL,
+        fotoowl_index_num INTEGER NOT NULL,
+        fotoowl_x1 FLOAT,
+        fotoowl_x2 FLOAT,
+        fotoowl_y1 FLOAT,
+        fotoowl_y2 FLOAT,
+        fotoowl_aria_ratio FLOAT
+    ) ON COMMIT DROP
+""")
+
+COPY_STAGING_SQL = """
+    COPY fotoowl_request_mapping_staging
+    (fotoowl_request_id, fotoowl_event_id, fotoowl_image_id, fotoowl_index_num,
+     fotoowl_x1, fotoowl_x2, fotoowl_y1, fotoowl_y2, fotoowl_aria_ratio)
+    FROM STDIN WITH (FORMAT csv)
+"""
+
+# Inserts the staged rows and, in the same statement, returns the triplets that
+# were skipped because they already existed (staged triplets are unique)
+INSERT_FROM_STAGING_SQL = text("""
+    WITH inserted AS (
+        INSERT INTO fotoowl_request_mapping
+        (fotoowl_request_id, fotoowl_event_id, fotoowl_image_id, fotoowl_index_num,
+         fotoowl_x1, fotoowl_x2, fotoowl_y1, fotoowl_y2, fotoowl_aria_ratio)
+        SELECT fotoowl_request_id, fotoowl_event_id, fotoowl_image_id, fotoowl_index_num,
+               fotoowl_x1, fotoowl_x2, fotoowl_y1, fotoowl_y2, fotoowl_aria_ratio
+        FROM fotoowl_request_mapping_staging
+        ON CONFLICT (fotoowl_event_id, fotoowl_index_num, fotoowl_request_id) DO NOTHING
+        RETURNING fotoowl_event_id, fotoowl_index_num, fotoowl_request_id
+    )
+    SELECT s.fotoowl_event_id, s.fotoowl_index_num, s.fotoowl_request_id
+    FROM fotoowl_request_mapping_staging s
+    LEFT JOIN inserted i
+        USING (fotoowl_event_id, fotoowl_index_num, fotoowl_request_id)
+    WHERE i.fotoowl_event_id IS NULL
+""")
+
+# Rows per COPY into the staging table. COPY streams rows instead of building one
+# SQL string, so chunks only bound the size of the in-memory CSV buffer
+CHUNK_SIZE = int(os.getenv("FOTOOWL_BULK_CHUNK", "5000"))
+
+# Rows fetched per server-side cursor round-trip (and per streamed chunk) when
+# listing an event's mappings
+STREAM_BATCH_SIZE = 1000
+
+# Size of the reads psycopg2 makes from the CSV buffer while streaming COPY data
+COPY_BUFFER_SIZE = 64 * 1024
+
+def _bulk_insert_mappings(db: Session, mappings: List[FotoOwlRequestMappingCreate]) -> List[Tuple[int, int, int]]:
+    """
+    Insert mappings that don't exist yet and return the skipped
+    (fotoowl_event_id, fotoowl_index_num, fotoowl_request_id) triplets
+    
+    Repeats within the batch and triplets already in the table are skipped;
+    the caller owns the transaction (commit/rollback)
+    """
+    skipped = []
+    
+    # Step 1: Drop repeats of a triplet within the batch before touching the DB,
+    # keeping the last occurrence
+    log_skips = logger.isEnabledFor(logging.DEBUG)
+    unique_mappings = {}
+    for mapping_data in mappings:
+        triplet = (mapping_data.fotoowl_event_id, mapping_data.fotoowl_index_num, mapping_data.fotoowl_request_id)
+        if triplet in unique_mappings:
+            skipped.append(triplet)
+            if log_skips:
+                logger.debug("Skipping repeated event_id %s + index_num %s + request_id %s triplet in batch", *triplet)
+        unique_mappings[triplet] = mapping_data
+    unique = list(unique_mappings.values())
+    
+    # Step 2: Stage the input in a transaction-scoped temp table using COPY in chunks
+    db.execute(CREATE_STAGING_SQL)
+    
+    # Raw psycopg2 cursor on the session's connection, so the COPY joins
+    # the session transaction and is committed/rolled back with it
+    cursor = db.connection().connection.cursor()
+    try:
+        for i in range(0, len(unique), CHUNK_SIZE):
+            chunk = unique[i:i + CHUNK_SIZE]
+            
+            # Serialize the chunk as CSV; None becomes an empty unquoted
+            # field, which COPY reads as NULL
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(
+                (
+                    mapping.fotoowl_request_id,
+                    mapping.fotoowl_event_id,
+                    mapping.fotoowl_image_id,
+                    mapping.fotoowl_index_num,
+                    mapping.fotoowl_x1,
+                    mapping.fotoowl_x2,
+                    mapping.fotoowl_y1,
+                    mapping.fotoowl_y2,
+                    mapping.fotoowl_aria_ratio
+                )
+                for mapping in chunk
+            )
+            buffer.seek(0)
+            
+            cursor.copy_expert(COPY_STAGING_SQL, buffer, size=COPY_BUFFER_SIZE)
+            logger.debug("Staged chunk of %d records", len(chunk))
+    finally:
+        cursor.close()
+    
+    # Step 3: Insert staged rows, letting the unique triplet index skip the ones
+    # that already exist; created_at/updated_at are filled by their server defaults.
+    # The statement returns the skipped triplets, so no matching happens here
+    for row in db.execute(INSERT_FROM_STAGING_SQL):
+        skipped.append(tuple(row))
+        if log_skips:
+            logger.debug("Skipping duplicate event_id %s + index_num %s + request_id %s triplet", *row)
+    
+    return skipped
+
+@router.post(
+    "/internal/fotoowl-request-mapping/bulk",
+    response_class=ORJSONResponse,
+    responses={200: {"model": FotoOwlRequestMappingBulkResponse}}
+)
+def bulk_insert_fotoowl_request_mappings(
     bulk_data: FotoOwlRequestMappingBulkInsert,
+    include_skipped: bool = Query(False, description="Return the skipped triplets in skipped_pairs (counts are always returned)"),
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
 ):
@@ -30,91 +160,33 @@ async def bulk_insert_fotoowl_request_mappings(
     
     For each event_id, fotoowl_index_num should not repeat
     If fotoowl_event_id + fotoowl_index_num + fotoowl_request_id triplet already exists, it will be skipped
-    Uses chunked bulk inserts (500 records per chunk) for optimal performance
+    Stages rows with chunked COPY (FOTOOWL_BULK_CHUNK records per chunk), then inserts them with
+    ON CONFLICT DO NOTHING so duplicates are skipped in the same statement
+    skipped_pairs is only filled when include_skipped=true
     """
     
     total_received = len(bulk_data.mappings)
-    total_inserted = 0
-    total_skipped = 0
-    skipped_triplets = []
-    CHUNK_SIZE = 500
     
     try:
-        # Step 1: Filter out duplicates by checking existing triplets in bulk
-        event_index_request_triplets = [(m.fotoowl_event_id, m.fotoowl_index_num, m.fotoowl_request_id) for m in bulk_data.mappings]
+        skipped = _bulk_insert_mappings(db, bulk_data.mappings)
         
-        if event_index_request_triplets:
-            # Create a query to check all triplets at once
-            triplets_str = ",".join([f"({event_id},{index_num},{request_id})" for event_id, index_num, request_id in event_index_request_triplets])
-            existing_triplets_query = text(f"""
-                SELECT fotoowl_event_id, fotoowl_index_num, fotoowl_request_id 
-                FROM fotoowl_request_mapping 
-                WHERE (fotoowl_event_id, fotoowl_index_num, fotoowl_request_id) IN (VALUES {triplets_str})
-            """)
-            
-            existing_triplets_result = db.execute(existing_triplets_query).fetchall()
-            existing_triplets = {(row[0], row[1], row[2]) for row in existing_triplets_result}
-        else:
-            existing_triplets = set()
-        
-        # Step 2: Filter out duplicates from the input
-        new_mappings = []
-        for mapping_data in bulk_data.mappings:
-            triplet = (mapping_data.fotoowl_event_id, mapping_data.fotoowl_index_num, mapping_data.fotoowl_request_id)
-            if triplet in existing_triplets:
-                total_skipped += 1
-                skipped_triplets.append({
-                    "event_id": mapping_data.fotoowl_event_id, 
-                    "index_num": mapping_data.fotoowl_index_num,
-                    "request_id": mapping_data.fotoowl_request_id
-                })
-                logger.info(f"Skipping duplicate event_id {mapping_data.fotoowl_event_id} + index_num {mapping_data.fotoowl_index_num} + request_id {mapping_data.fotoowl_request_id} triplet")
-            else:
-                new_mappings.append(mapping_data)
-        
-        # Step 3: Bulk insert in chunks using PostgreSQL's bulk insert
-        if new_mappings:
-            for i in range(0, len(new_mappings), CHUNK_SIZE):
-                chunk = new_mappings[i:i + CHUNK_SIZE]
-                
-                # Prepare bulk insert values
-                values_list = []
-                for mapping in chunk:
-                    values_list.append(
-                        f"({mapping.fotoowl_request_id}, {mapping.fotoowl_event_id}, "
-                        f"{mapping.fotoowl_image_id}, {mapping.fotoowl_index_num}, "
-                        f"{mapping.fotoowl_x1 if mapping.fotoowl_x1 is not None else 'NULL'}, "
-                        f"{mapping.fotoowl_x2 if mapping.fotoowl_x2 is not None else 'NULL'}, "
-                        f"{mapping.fotoowl_y1 if mapping.fotoowl_y1 is not None else 'NULL'}, "
-                        f"{mapping.fotoowl_y2 if mapping.fotoowl_y2 is not None else 'NULL'}, "
-                        f"{mapping.fotoowl_aria_ratio if mapping.fotoowl_aria_ratio is not None else 'NULL'}, "
-                        f"NOW(), NOW())"
-                    )
-                
-                # Execute bulk insert for this chunk
-                bulk_insert_query = text(f"""
-                    INSERT INTO fotoowl_request_mapping 
-                    (fotoowl_request_id, fotoowl_event_id, fotoowl_image_id, fotoowl_index_num,
-                     fotoowl_x1, fotoowl_x2, fotoowl_y1, fotoowl_y2, fotoowl_aria_ratio,
-                     created_at, updated_at)
-                    VALUES {','.join(values_list)}
-                """)
-                
-                db.execute(bulk_insert_query)
-                total_inserted += len(chunk)
-                logger.info(f"Inserted chunk of {len(chunk)} records (total so far: {total_inserted})")
+        total_skipped = len(skipped)
+        total_inserted = total_received - total_skipped
         
         # Commit all insertions
         db.commit()
         
-        logger.info(f"Bulk insert completed: {total_inserted} inserted, {total_skipped} skipped out of {total_received} received")
+        logger.info("Bulk insert completed: %d inserted, %d skipped out of %d received", total_inserted, total_skipped, total_received)
         
-        return FotoOwlRequestMappingBulkResponse(
-            total_received=total_received,
-            total_inserted=total_inserted,
-            total_skipped=total_skipped,
-            skipped_pairs=skipped_triplets
-        )
+        return ORJSONResponse({
+            "total_received": total_received,
+            "total_inserted": total_inserted,
+            "total_skipped": total_skipped,
+            "skipped_pairs": [
+                {"event_id": event_id, "index_num": index_num, "request_id": request_id}
+                for event_id, index_num, request_id in skipped
+            ] if include_skipped else []
+        })
         
     except Exception as e:
         db.rollback()
@@ -124,8 +196,12 @@ async def bulk_insert_fotoowl_request_mappings(
             detail=f"Error during bulk insert: {str(e)}"
         )
 
-@router.get("/internal/fotoowl-request-mapping/event/{event_id}", response_model=List[FotoOwlRequestMappingResponse])
-async def get_fotoowl_request_mappings_by_event(
+@router.get(
+    "/internal/fotoowl-request-mapping/event/{event_id}",
+    response_class=StreamingResponse,
+    responses={200: {"model": List[FotoOwlRequestMappingResponse]}}
+)
+def get_fotoowl_request_mappings_by_event(
     event_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
@@ -133,15 +209,27 @@ async def get_fotoowl_request_mappings_by_event(
     """
     Get all FotoOwl request mappings for a specific event
     Requires internal service authentication
+    
+    Rows are fetched through a server-side cursor and streamed in batches,
+    so large events are never held in memory all at once
     """
-    mappings = db.query(FotoOwlRequestMapping).filter(
-        FotoOwlRequestMapping.fotoowl_event_id == event_id
-    ).order_by(FotoOwlRequestMapping.fotoowl_index_num.asc()).all()
+    # Core select on the table: plain row mappings, no ORM instances or identity map
+    partitions = db.execute(
+        select(FotoOwlRequestMapping.__table__).where(
+            FotoOwlRequestMapping.fotoowl_event_id == event_id
+        ).order_by(
+            FotoOwlRequestMapping.fotoowl_index_num.asc()
+        ).execution_options(yield_per=STREAM_BATCH_SIZE)
+    ).mappings().partitions()
     
-    return mappings
+    return StreamingResponse(iter_json_array(partitions), media_type="application/json")
 
-@router.get("/internal/fotoowl-request-mapping/{mapping_id}", response_model=FotoOwlRequestMappingResponse)
-async def get_fotoowl_request_mapping(
+@router.get(
+    "/internal/fotoowl-request-mapping/{mapping_id}",
+    response_class=ORJSONResponse,
+    responses={200: {"model": FotoOwlRequestMappingResponse}}
+)
+def get_fotoowl_request_mapping(
     mapping_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
@@ -150,17 +238,20 @@ async def get_fotoowl_request_mapping(
     Get a specific FotoOwl request mapping by ID
     Requires internal service authentication
     """
-    mapping = db.query(FotoOwlRequestMapping).filter(FotoOwlRequestMapping.id == mapping_id).first()
+    mapping = db.execute(
+        select(FotoOwlRequestMapping.__table__).where(FotoOwlRequestMapping.id == mapping_id)
+    ).mappings().first()
     if not mapping:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="FotoOwl request mapping not found"
         )
     
-    return mapping
+    # The row already has the response shape; serialize it without re-validation
+    return ORJSONResponse(dict(mapping))
 
 @router.delete("/internal/fotoowl-request-mapping/event/{event_id}")
-async def delete_fotoowl_request_mappings_by_event(
+def delete_fotoowl_request_mappings_by_event(
     event_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
@@ -169,9 +260,14 @@ async def delete_fotoowl_request_mappings_by_event(
     Delete all FotoOwl request mappings for a specific event
     Requires internal service authentication
     """
-    deleted_count = db.query(FotoOwlRequestMapping).filter(
-        FotoOwlRequestMapping.fotoowl_event_id == event_id
-    ).delete()
+    # Plain DELETE; nothing from this table is loaded in the session, so skip
+    # ORM session synchronization
+    result = db.execute(
+        delete(FotoOwlRequestMapping).where(
+            FotoOwlRequestMapping.fotoowl_event_id == event_id
+        ).execution_options(synchronize_session=False)
+    )
+    deleted_count = result.rowcount
     
     db.commit()
     
@@ -1,18 +1,97 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select, tuple_, update
 from typing import List, Optional
+from datetime import datetime
+import csv
+import io
 import logging
+import os
 from app.database import get_db
-from app.schemas import ImageCreate, ImageUpdate, ImageResponse, ImageListResponse
-from app.models import Image, User, EventRequestMapping
+from app.schemas import ImageCreate, ImageBulkCreate, ImageBulkResponse, ImageUpdate, ImageResponse, ImageListResponse, ImageListAdapter, from_orm_fast
+from app.models import Image, User
 from app.auth import verify_internal_auth, get_current_user
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.responses import ORJSONResponse, iter_json_array
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Rows fetched per round-trip when streaming a user's full image list
+STREAM_BATCH_SIZE = 200
+
+# ImageListResponse fields
+IMAGE_LIST_COLUMNS = (
+    Image.id, Image.name, Image.user_id, Image.fotoowl_image_id,
+    Image.fotoowl_url, Image.filecoin_url, Image.filecoin_cid,
+    Image.size, Image.height, Image.width, Image.description,
+    Image.image_encoding, Image.event_id, Image.image_url,
+    Image.created_at, Image.updated_at
+)
+
+# Bulk image ingestion streams rows straight into images with COPY. NULL is
+# written as \N so that empty strings stay empty strings
+COPY_IMAGES_SQL = """
+    COPY images
+    (name, user_id, fotoowl_image_id, fotoowl_url, filecoin_url, filecoin_cid,
+     size, height, width, description, image_encoding, event_id)
+    FROM STDIN WITH (FORMAT csv, NULL '\\N')
+"""
+COPY_NULL = "\\N"
+
+# Rows per COPY; chunks only bound the size of the in-memory CSV buffer
+CHUNK_SIZE = int(os.getenv("IMAGES_BULK_CHUNK", "5000"))
+
+# Size of the reads psycopg2 makes from the CSV buffer while streaming COPY data
+COPY_BUFFER_SIZE = 64 * 1024
+
+def _bulk_insert_images(db: Session, images: List[ImageCreate]) -> int:
+    """
+    COPY image records into the images table and return the number inserted
+    The caller owns the transaction (commit/rollback)
+    """
+    # Raw psycopg2 cursor on the session's connection, so the COPY joins
+    # the session transaction and is committed/rolled back with it
+    cursor = db.connection().connection.cursor()
+    try:
+        for i in range(0, len(images), CHUNK_SIZE):
+            chunk = images[i:i + CHUNK_SIZE]
+            
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(
+                tuple(
+                    COPY_NULL if value is None else value
+                    for value in (
+                        image.name,
+                        image.user_id,
+                        image.fotoowl_image_id,
+                        image.original_image_url,
+                        image.filecoin_url,
+                        image.cid,
+                        image.size,
+                        image.height,
+                        image.width,
+                        image.description,
+                        image.image_encoding,
+                        image.event_id
+                    )
+                )
+                for image in chunk
+            )
+            buffer.seek(0)
+            
+            cursor.copy_expert(COPY_IMAGES_SQL, buffer, size=COPY_BUFFER_SIZE)
+            logger.debug("Copied chunk of %d images", len(chunk))
+    finally:
+        cursor.close()
+    
+    return len(images)
+
 @router.post("/internal/images")
-async def create_image(
+def create_image(
     image_data: ImageCreate,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
@@ -26,17 +105,20 @@ async def create_image(
     """
 
     # If this is a selfie and has a user_id, update the user's selfie fields
-    logger.info(f"Selfie check: is_selfie={image_data.is_selfie}, user_id={image_data.user_id}")
-    new_image= None
+    logger.info("Selfie check: is_selfie=%s, user_id=%s", image_data.is_selfie, image_data.user_id)
     if image_data.is_selfie and image_data.user_id:
-        logger.info(f"Updating selfie for user_id={image_data.user_id}")
-        user = db.query(User).filter(User.id == image_data.user_id).first()
-        if user:
-            logger.info(f"Found user: {user.username}, updating selfie_cid={image_data.cid}, selfie_url={image_data.filecoin_url}")
-            user.selfie_cid = image_data.cid
-            user.selfie_url = image_data.filecoin_url
-            user.selfie_height = image_data.height
-            user.selfie_width = image_data.width
+        logger.info("Updating selfie for user_id=%s", image_data.user_id)
+        # Update the selfie fields directly, without loading the user first
+        db.execute(
+            update(User)
+            .where(User.id == image_data.user_id)
+            .values(
+                selfie_cid=image_data.cid,
+                selfie_url=image_data.filecoin_url,
+                selfie_height=image_data.height,
+                selfie_width=image_data.width
+            )
+        )
     else:
         new_image = Image(
             name=image_data.name,
@@ -57,11 +139,54 @@ async def create_image(
     
     # Commit both image and user updates in a single transaction
     db.commit()
-    if new_image:
-        db.refresh(new_image)
+
+@router.post(
+    "/internal/images/bulk",
+    response_class=ORJSONResponse,
+    responses={200: {"model": ImageBulkResponse}}
+)
+def bulk_create_images(
+    bulk_data: ImageBulkCreate,
+    db: Session = Depends(get_db),
+    _: bool = Depends(verify_internal_auth)
+):
+    """
+    Internal API to create many image records in one request
+    Requires internal service authentication
+    
+    Accepts up to IMAGE_BULK_MAX_RECORDS records with the same fields as /internal/images
+    and loads them with chunked COPY (IMAGES_BULK_CHUNK records per chunk). Selfie updates are not supported here;
+    send those to /internal/images
+    """
+    for index, image in enumerate(bulk_data.images):
+        if image.is_selfie and image.user_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"images[{index}]: selfie images must be created through /internal/images"
+            )
+    
+    total_received = len(bulk_data.images)
+    
+    try:
+        total_inserted = _bulk_insert_images(db, bulk_data.images)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Error during bulk image insert: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error during bulk image insert: {str(e)}"
+        )
+    
+    logger.info("Bulk image insert completed: %d inserted out of %d received", total_inserted, total_received)
+    
+    return ORJSONResponse({
+        "total_received": total_received,
+        "total_inserted": total_inserted
+    })
 
 @router.get("/internal/images/{image_id}", response_model=ImageResponse)
-async def get_image(
+def get_image(
     image_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
@@ -80,7 +205,7 @@ async def get_image(
     return image
 
 @router.put("/internal/images/{image_id}", response_model=ImageResponse)
-async def update_image(
+def update_image(
     image_id: int,
     image_data: ImageUpdate,
     db: Session = Depends(get_db),
@@ -108,36 +233,41 @@ async def update_image(
         setattr(image, field, value)
     
     # If this is a selfie and the image has a user_id, update the user's selfie fields
-    logger.info(f"PUT Selfie check: is_selfie={image_data.is_selfie}, user_id={image.user_id}")
+    logger.info("PUT Selfie check: is_selfie=%s, user_id=%s", image_data.is_selfie, image.user_id)
     if image_data.is_selfie and image.user_id:
-        logger.info(f"PUT Updating selfie for user_id={image.user_id}")
-        user = db.query(User).filter(User.id == image.user_id).first()
-        if user:
-            logger.info(f"PUT Found user: {user.username}, updating selfie_cid={image.filecoin_cid}, selfie_url={image.fotoowl_url}")
-            # Use the updated image's current values for selfie fields
-            user.selfie_cid = image.filecoin_cid
-            user.selfie_url = image.fotoowl_url
-            user.selfie_height = image.height
-            user.selfie_width = image.width
-        else:
-            logger.error(f"PUT User with id {image.user_id} not found")
+        logger.info("PUT Updating selfie for user_id=%s", image.user_id)
+        # Use the updated image's current values for selfie fields
+        result = db.execute(
+            update(User)
+            .where(User.id == image.user_id)
+            .values(
+                selfie_cid=image.filecoin_cid,
+                selfie_url=image.fotoowl_url,
+                selfie_height=image.height,
+                selfie_width=image.width
+            )
+        )
+        if result.rowcount == 0:
+            logger.error("PUT User with id %s not found", image.user_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"User with id {image.user_id} not found"
             )
-    else:
-        logger.info(f"PUT Not updating selfie: is_selfie={image_data.is_selfie}, user_id={image.user_id}")
     
-    # Commit both image and user updates in a single transaction
+    # Commit both image and user updates in a single transaction; updated_at and
+    # image_url come back through RETURNING (eager_defaults), so no refresh is needed
     db.commit()
-    db.refresh(image)
     
     return image
 
 # User-specific image endpoints (require user authentication)
 
-@router.get("/images", response_model=List[ImageListResponse])
-async def get_user_images(
+@router.get(
+    "/images",
+    response_class=StreamingResponse,
+    responses={200: {"model": List[ImageListResponse]}}
+)
+def get_user_images(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -145,39 +275,20 @@ async def get_user_images(
     Get all images for the authenticated user
     Requires user authentication
     Each image includes computed 'image_url' field: filecoin_url if available, otherwise fotoowl_url
-    """
-    images = db.query(Image).filter(Image.user_id == current_user.id).order_by(Image.created_at.desc()).all()
     
-    # Convert to response format with computed image_url
-    response_images = []
-    for image in images:
-        # Determine image_url: prioritize filecoin_url over fotoowl_url
-        image_url = image.filecoin_url if image.filecoin_url else image.fotoowl_url
-        
-        image_dict = {
-            "id": image.id,
-            "name": image.name,
-            "user_id": image.user_id,
-            "fotoowl_image_id": image.fotoowl_image_id,
-            "fotoowl_url": image.fotoowl_url,
-            "filecoin_url": image.filecoin_url,
-            "filecoin_cid": image.filecoin_cid,
-            "size": image.size,
-            "height": image.height,
-            "width": image.width,
-            "description": image.description,
-            "image_encoding": image.image_encoding,
-            "event_id": image.event_id,
-            "image_url": image_url,  # Computed field
-            "created_at": image.created_at,
-            "updated_at": image.updated_at
-        }
-        response_images.append(ImageListResponse(**image_dict))
+    The list is unbounded, so it is streamed in batches instead of being loaded at once
+    """
+    partitions = db.execute(
+        select(*IMAGE_LIST_COLUMNS)
+        .where(Image.user_id == current_user.id)
+        .order_by(Image.created_at.desc(), Image.id.desc())
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    ).mappings().partitions()
     
-    return response_images
+    return StreamingResponse(iter_json_array(partitions), media_type="application/json")
 
 @router.get("/images/{image_id}", response_model=ImageResponse)
-async def get_user_image(
+def get_user_image(
     image_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -199,12 +310,17 @@ async def get_user_image(
     
     return image
 
-@router.get("/getImageList", response_model=List[ImageListResponse])
-async def get_image_list(
+@router.get(
+    "/getImageList",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[ImageListResponse]}}
+)
+def get_image_list(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of images to return"),
-    offset: Optional[int] = Query(0, ge=0, description="Number of images to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    offset: Optional[int] = Query(0, ge=0, deprecated=True, description="Number of images to skip (ignored when cursor is given)"),
     event_id: Optional[int] = Query(None, description="Filter by specific event_id")
 ):
     """
@@ -216,54 +332,48 @@ async def get_image_list(
     
     Optional filters:
     - limit: Maximum number of images to return (1-100)
-    - offset: Number of images to skip (for pagination)  
+    - cursor: Continue after the last image of the previous page (for pagination)
+    - offset: Deprecated, number of images to skip; use cursor instead
     - event_id: Filter by specific event_id
+    
+    When more images may follow, the X-Next-Cursor response header holds the cursor for the next page
     """
     
-    # Start with base query for user's images
-    query = db.query(Image).filter(Image.user_id == current_user.id)
+    # Start with base query for user's images, selecting only the response columns.
+    # Built as a lambda statement so the construction is cached across requests;
+    # the captured values become bound parameters
+    user_id = current_user.id
+    stmt = lambda_stmt(lambda: select(*IMAGE_LIST_COLUMNS).where(Image.user_id == user_id))
     
     # Apply event_id filter if provided
     if event_id is not None:
-        query = query.filter(Image.event_id == event_id)
+        stmt += lambda s: s.where(Image.event_id == event_id)
     
-    # Order by created_at descending (newest first)
-    query = query.order_by(Image.created_at.desc())
+    # Order by created_at descending (newest first), id breaks ties so the cursor is unambiguous
+    stmt += lambda s: s.order_by(Image.created_at.desc(), Image.id.desc())
     
-    # Apply offset
-    if offset > 0:
-        query = query.offset(offset)
+    # Seek past the previous page; falls back to offset for older clients
+    if cursor is not None:
+        last_created_at, last_id = decode_cursor(cursor, datetime.fromisoformat)
+        stmt += lambda s: s.where(tuple_(Image.created_at, Image.id) < tuple_(last_created_at, last_id))
+    elif offset > 0:
+        stmt += lambda s: s.offset(offset)
     
     # Apply limit
     if limit is not None:
-        query = query.limit(limit)
+        stmt += lambda s: s.limit(limit)
     
-    images = query.all()
+    rows = db.execute(stmt).all()
     
-    # Convert to response format with computed image_url
-    response_images = []
-    for image in images:
-        # Determine image_url: prioritize filecoin_url over fotoowl_url
-        image_url = image.filecoin_url if image.filecoin_url else image.fotoowl_url
-        
-        image_dict = {
-            "id": image.id,
-            "name": image.name,
-            "user_id": image.user_id,
-            "fotoowl_image_id": image.fotoowl_image_id,
-            "fotoowl_url": image.fotoowl_url,
-            "filecoin_url": image.filecoin_url,
-            "filecoin_cid": image.filecoin_cid,
-            "size": image.size,
-            "height": image.height,
-            "width": image.width,
-            "description": image.description,
-            "image_encoding": image.image_encoding,
-            "event_id": image.event_id,
-            "image_url": image_url,  # Computed field
-            "created_at": image.created_at,
-            "updated_at": image.updated_at
-        }
-        response_images.append(ImageListResponse(**image_dict))
+    # A full page means there may be more images after it
+    headers = None
+    if limit is not None and len(rows) == limit:
+        headers = {NEXT_CURSOR_HEADER: encode_cursor(rows[-1].created_at, rows[-1].id)}
     
-    return response_images
\ No newline at end of file
+    # Rows already have the response shape, so skip model validation; serializing
+    # through the shared list adapter keeps the ImageListResponse wire format
+    images = ImageListAdapter.dump_python(
+        [from_orm_fast(ImageListResponse, row) for row in rows],
+        mode="json"
+    )
+    return ORJSONResponse(images, headers=headers)
\ No newline at end of file
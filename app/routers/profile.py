@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.schemas import UserProfile, UserProfileUpdate, InstagramPostResponse, UserInfoResponse
 from app.models import User, UserInstaPost
 from app.auth import get_current_user, verify_internal_auth
@@ -12,6 +12,10 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Compiled once; normalize_instagram_url runs on every profile update
+_INSTA_URL_RE = re.compile(r'instagram\.com/([^/?]+)')
+_INSTA_HANDLE_RE = re.compile(r'^[a-zA-Z0-9._]+$')
+
 def normalize_instagram_url(instagram_input: str) -> str:
     """
     Normalize Instagram handle or URL to a proper Instagram URL
@@ -33,7 +37,7 @@ def normalize_instagram_url(instagram_input: str) -> str:
         # If it's already a full URL, extract the username
         if 'instagram.com' in handle:
             # Extract username from URL using regex
-            match = re.search(r'instagram\.com/([^/?]+)', handle)
+            match = _INSTA_URL_RE.search(handle)
             if match:
                 username = match.group(1)
             else:
@@ -48,7 +52,7 @@ def normalize_instagram_url(instagram_input: str) -> str:
         username = username.rstrip('/').split('/')[0].split('?')[0]
         
         # Validate username format (alphanumeric, dots, underscores only)
-        if not re.match(r'^[a-zA-Z0-9._]+$', username) or len(username) < 1:
+        if not _INSTA_HANDLE_RE.match(username) or len(username) < 1:
             logger.warning(f"Invalid Instagram username format: {username}")
             return None
         
@@ -59,9 +63,26 @@ def normalize_instagram_url(instagram_input: str) -> str:
         logger.error(f"Error normalizing Instagram URL '{instagram_input}': {e}")
         return None
 
+async def sync_instagram_posts(user_id: int, instagram_url: str):
+    """
+    Fetch and save a user's Instagram posts after the profile response has been sent
+    Runs outside the request, so it opens its own session
+    """
+    db = SessionLocal()
+    try:
+        logger.info(f"Fetching Instagram posts for user {user_id} with URL: {instagram_url}")
+        result = await instagram_service.fetch_and_save_user_posts(db, user_id, instagram_url)
+        logger.info(f"Instagram posts fetch result: {result}")
+    except Exception as e:
+        # The profile update was already successful, Instagram fetch is optional
+        logger.error(f"Error fetching Instagram posts for user {user_id}: {e}")
+    finally:
+        db.close()
+
 @router.put("/profile", response_model=UserProfile)
-async def update_profile(
+def update_profile(
     profile_data: UserProfileUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -94,19 +115,9 @@ async def update_profile(
     db.commit()
     db.refresh(current_user)
     
-    # If Instagram URL was updated, fetch and save Instagram posts
+    # If Instagram URL was updated, fetch and save Instagram posts once the response is sent
     if instagram_url_updated and current_user.instagram_url:
-        try:
-            logger.info(f"Fetching Instagram posts for user {current_user.id} with URL: {current_user.instagram_url}")
-            result = await instagram_service.fetch_and_save_user_posts(
-                db, current_user.id, current_user.instagram_url
-            )
-            logger.info(f"Instagram posts fetch result: {result}")
-        except Exception as e:
-            logger.error(f"Error fetching Instagram posts for user {current_user.id}: {e}")
-            # Don't fail the profile update if Instagram fetch fails
-            # The profile update was successful, Instagram fetch is optional
-            # We could optionally add a field to track fetch status if needed
+        background_tasks.add_task(sync_instagram_posts, current_user.id, current_user.instagram_url)
     
     return current_user
 
@@ -122,7 +133,7 @@ async def get_profile(
     return current_user
 
 @router.get("/instagram-posts", response_model=list[InstagramPostResponse])
-async def get_instagram_posts(
+def get_instagram_posts(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -137,7 +148,7 @@ async def get_instagram_posts(
     return posts
 
 @router.get("/internal/get-user-info/{user_id}", response_model=UserInfoResponse)
-async def get_user_info(
+def get_user_info(
     user_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_internal_auth)
@@ -1,19 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import and_, exists, lambda_stmt, null, or_, select
 from typing import List, Optional
+from datetime import date
+import threading
+from cachetools import TTLCache
 from app.database import get_db
-from app.schemas import EventResponse
+from app.schemas import EventResponse, EventListAdapter, from_orm_fast
 from app.models import Event, EventRequestMapping, User
 from app.auth import get_current_user_optional
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.responses import ORJSONResponse
 
 router = APIRouter()
 
-@router.get("/getEventList", response_model=List[EventResponse])
-async def get_event_list(
+# Anonymous responses are the same for every visitor, so they are kept for a
+# short TTL; authenticated responses carry per-user registration flags and are
+# never cached
+_public_event_cache = TTLCache(maxsize=256, ttl=60)
+_public_event_cache_lock = threading.Lock()
+
+def registered_for(user_id: int):
+    """EXISTS flag for whether the given user is registered for each Event row"""
+    return exists().where(
+        EventRequestMapping.user_id == user_id,
+        EventRequestMapping.fotoowl_event_id == Event.fotoowl_event_id
+    )
+
+@router.get(
+    "/getEventList",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[EventResponse]}}
+)
+def get_event_list(
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional),
     limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of events to return"),
-    offset: Optional[int] = Query(0, ge=0, description="Number of events to skip")
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    offset: Optional[int] = Query(0, ge=0, deprecated=True, description="Number of events to skip (ignored when cursor is given)")
 ):
     """
     Get list of all public events
@@ -21,51 +45,81 @@ async def get_event_list(
     
     Optional parameters:
     - limit: Maximum number of events to return (1-100)
-    - offset: Number of events to skip (for pagination)
+    - cursor: Continue after the last event of the previous page (for pagination)
+    - offset: Deprecated, number of events to skip; use cursor instead
     
     Returns events ordered by event_date descending (latest events first)
+    When more events may follow, the X-Next-Cursor response header holds the cursor for the next page
     If user is authenticated, includes 'registered' field indicating if user is registered for each event
     """
+    cache_key = ("list", limit, cursor, offset)
+    if current_user is None:
+        with _public_event_cache_lock:
+            cached = _public_event_cache.get(cache_key)
+        if cached is not None:
+            events, headers = cached
+            return ORJSONResponse(events, headers=headers)
+    
+    # Start with base query for all events, with the caller's registration status
+    # for each one; the same statement serves authenticated and anonymous callers.
+    # No user has id -1, so anonymous callers get a false flag
+    user_id = current_user.id if current_user else -1
+    # Built as a lambda statement so the construction is cached across requests;
+    # the captured values become bound parameters
+    stmt = lambda_stmt(lambda: select(Event, registered_for(user_id).label("registered")))
     
-    # Start with base query for all events
-    query = db.query(Event)
+    # List responses must not lazy load; any relationship they need has to be loaded explicitly
+    stmt += lambda s: s.options(raiseload("*"))
     
-    # Order by event_date descending (latest events first), with null dates at the end
-    query = query.order_by(Event.event_date.desc().nullslast())
+    # Order by event_date descending (latest events first), with null dates at the end;
+    # id breaks ties so the cursor is unambiguous
+    stmt += lambda s: s.order_by(Event.event_date.desc().nullslast(), Event.id.desc())
     
-    # Apply offset
-    if offset > 0:
-        query = query.offset(offset)
+    # Seek past the previous page; falls back to offset for older clients
+    if cursor is not None:
+        last_event_date, last_id = decode_cursor(cursor, date.fromisoformat)
+        if last_event_date is None:
+            # Already into the trailing events without a date
+            stmt += lambda s: s.where(Event.event_date.is_(None), Event.id < last_id)
+        else:
+            stmt += lambda s: s.where(or_(
+                Event.event_date < last_event_date,
+                and_(Event.event_date == last_event_date, Event.id < last_id),
+                Event.event_date.is_(None)
+            ))
+    elif offset > 0:
+        stmt += lambda s: s.offset(offset)
     
     # Apply limit
     if limit is not None:
-        query = query.limit(limit)
-    
-    events = query.all()
-    
-    # If user is authenticated, check registration status for each event
-    if current_user:
-        # Get all event IDs that user is registered for
-        registered_event_ids = db.query(EventRequestMapping.fotoowl_event_id).filter(
-            EventRequestMapping.user_id == current_user.id
-        ).all()
-        registered_event_ids = {row[0] for row in registered_event_ids}
-        
-        # Add registration status to each event
-        for event in events:
-            if event.fotoowl_event_id and event.fotoowl_event_id in registered_event_ids:
-                event.registered = True
-            else:
-                event.registered = False
-    else:
-        # If not authenticated, set registered to None for all events
-        for event in events:
-            event.registered = False
-    
-    return events
+        stmt += lambda s: s.limit(limit)
+    
+    # Add registration status to each event
+    events = []
+    for event, registered in db.execute(stmt):
+        event.registered = registered
+        events.append(event)
+    
+    # A full page means there may be more events after it
+    headers = None
+    if limit is not None and len(events) == limit:
+        headers = {NEXT_CURSOR_HEADER: encode_cursor(events[-1].event_date, events[-1].id)}
+    
+    # Serialized once through the shared list adapter; anonymous pages are cached
+    # already serialized so cache hits skip Pydantic entirely
+    events = EventListAdapter.dump_python(
+        [from_orm_fast(EventResponse, event) for event in events],
+        mode="json"
+    )
+    
+    if current_user is None:
+        with _public_event_cache_lock:
+            _public_event_cache[cache_key] = (events, headers)
+    
+    return ORJSONResponse(events, headers=headers)
 
 @router.get("/getEventList/{event_id}", response_model=EventResponse)
-async def get_event_by_id(
+def get_event_by_id(
     event_id: int,
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
@@ -74,24 +128,30 @@ async def get_event_by_id(
     Get a specific event by ID
     Authentication is optional - if authenticated, returns registration status for the event
     """
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
+    cache_key = ("event", event_id)
+    if current_user is None:
+        with _public_event_cache_lock:
+            cached = _public_event_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    # If user is authenticated, check registration status in the same query;
+    # if not authenticated, set registered to None
+    registered = registered_for(current_user.id) if current_user else null()
+    
+    row = db.query(Event, registered.label("registered")).filter(Event.id == event_id).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
         )
     
-    # If user is authenticated, check registration status
-    if current_user:
-        # Check if user is registered for this event
-        registration = db.query(EventRequestMapping).filter(
-            EventRequestMapping.user_id == current_user.id,
-            EventRequestMapping.fotoowl_event_id == event.fotoowl_event_id
-        ).first()
-        
-        event.registered = registration is not None
-    else:
-        # If not authenticated, set registered to None
-        event.registered = None
+    event = row.Event
+    event.registered = row.registered
+    
+    if current_user is None:
+        event = from_orm_fast(EventResponse, event)
+        with _public_event_cache_lock:
+            _public_event_cache[cache_key] = event
     
     return event
\ No newline at end of file
@@ -1,5 +1,9 @@
-from pydantic import BaseModel, HttpUrl, validator
-from typing import Optional, List
+from pydantic.main import BaseModel
+from pydantic.config import ConfigDict
+from pydantic.fields import Field
+from pydantic.functional_validators import model_validator
+from pydantic.type_adapter import TypeAdapter
+from typing import Optional, List, Type, TypeVar
 from datetime import datetime, date
 
 # User schemas
@@ -37,15 +41,16 @@ class UserProfile(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserLoginResponse(BaseModel):
     message: str
     user: UserProfile
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Image schemas
 class ImageCreate(BaseModel):
@@ -63,31 +68,24 @@ class ImageCreate(BaseModel):
     image_encoding: Optional[str] = None
     event_id: Optional[int] = None
     
-    @validator('user_id')
-    def validate_user_or_event_id(cls, user_id, values):
+    @model_validator(mode='after')
+    def validate_user_or_event_id(self):
         """Either user_id or event_id must be present"""
-        event_id = values.get('event_id')
-        if user_id is None and event_id is None:
+        if self.user_id is None and self.event_id is None:
             raise ValueError('Either user_id or event_id must be provided')
-        return user_id
+        return self
 
-class ImageUpdate(BaseModel):
-    name: Optional[str] = None
-    user_id: Optional[int] = None
-    is_selfie: Optional[bool] = False
-    fotoowl_image_id: Optional[int] = None
-    fotoowl_url: Optional[str] = None
-    filecoin_url: Optional[str] = None
-    filecoin_cid: Optional[str] = None
-    size: Optional[int] = None
-    height: Optional[int] = None
-    width: Optional[int] = None
-    description: Optional[str] = None
-    image_encoding: Optional[str] = None
-    event_id: Optional[int] = None
+# Upper bound on records per /internal/images/bulk request
+IMAGE_BULK_MAX_RECORDS = 50000
 
-class ImageResponse(BaseModel):
-    id: int
+class ImageBulkCreate(BaseModel):
+    images: List[ImageCreate] = Field(max_length=IMAGE_BULK_MAX_RECORDS)
+
+class ImageBulkResponse(BaseModel):
+    total_received: int
+    total_inserted: int
+
+class ImageBase(BaseModel):
     name: str
     user_id: Optional[int] = None
     fotoowl_image_id: Optional[int] = None
@@ -100,32 +98,23 @@ class ImageResponse(BaseModel):
     description: Optional[str] = None
     image_encoding: Optional[str] = None
     event_id: Optional[int] = None
+
+class ImageUpdate(ImageBase):
+    name: Optional[str] = None
+    is_selfie: Optional[bool] = False
+
+class ImageResponse(ImageBase):
+    id: int
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
-class ImageListResponse(BaseModel):
+class ImageListResponse(ImageResponse):
     id: Optional[int] = None  # Allow None for images not in our database
-    name: str
-    user_id: Optional[int] = None
-    fotoowl_image_id: Optional[int] = None
-    fotoowl_url: Optional[str] = None
-    filecoin_url: Optional[str] = None
-    filecoin_cid: Optional[str] = None
-    size: Optional[int] = None
-    height: Optional[int] = None
-    width: Optional[int] = None
-    description: Optional[str] = None
-    image_encoding: Optional[str] = None
-    event_id: Optional[int] = None
     image_url: Optional[str] = None  # Computed field: filecoin_url or fotoowl_url
     created_at: Optional[datetime] = None  # Allow None for external images
     updated_at: Optional[datetime] = None  # Allow None for external images
-    
-    class Config:
-        from_attributes = True
 
 # Event Registration schemas
 class EventRegistrationRequest(BaseModel):
@@ -140,8 +129,7 @@ class EventRegistrationResponse(BaseModel):
     redirect_url: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class FotoOwlApiResponse(BaseModel):
     ok: bool
@@ -164,8 +152,7 @@ class EventResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class RegisteredEventResponse(BaseModel):
     # Registration details
@@ -187,8 +174,7 @@ class RegisteredEventResponse(BaseModel):
     event_date: Optional[date] = None
     fotoowl_event_key: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Event matched images schemas
 class EventMatchedImagesRequest(BaseModel):
@@ -238,8 +224,7 @@ class FotoOwlRequestMappingResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class FotoOwlRequestMappingBulkInsert(BaseModel):
     mappings: List[FotoOwlRequestMappingCreate]
@@ -266,8 +251,7 @@ class InstagramPostResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class InstagramApiPost(BaseModel):
     code: str
@@ -299,8 +283,7 @@ class UserInfoResponse(BaseModel):
     # Instagram posts
     instagram_posts: List[InstagramPostResponse] = []
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # User Event Images schemas
 class UserEventImageResponse(BaseModel):
@@ -324,12 +307,51 @@ class UserEventImageResponse(BaseModel):
     event_name: Optional[str] = None
     event_location: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserEventImagesListResponse(BaseModel):
     images: List[UserEventImageResponse]
     total_count: int
     page: int
     page_size: int
-    total_pages: int
\ No newline at end of file
+    total_pages: int
+
+
+# Trusted ORM -> schema conversion
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Per-schema row builders, generated on first use
+_row_builders = {}
+
+def _make_row_builder(model_cls):
+    """Generate a builder that fills a model instance's __dict__ straight from a row"""
+    fields = tuple(model_cls.model_fields)
+    new = model_cls.__new__
+    
+    def from_row(obj):
+        instance = new(model_cls)
+        # Same state model_construct leaves behind, without its kwargs/defaults handling
+        object.__setattr__(instance, "__dict__", {field: getattr(obj, field, None) for field in fields})
+        object.__setattr__(instance, "__pydantic_fields_set__", set(fields))
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        return instance
+    
+    return from_row
+
+def from_orm_fast(model_cls: Type[ModelT], obj) -> ModelT:
+    """
+    Build a response schema from an ORM object or result row without validation
+    Safe only for data read back from our own database, whose column types already
+    match the schema; request bodies must keep going through normal validation
+    """
+    from_row = _row_builders.get(model_cls)
+    if from_row is None:
+        from_row = _row_builders[model_cls] = _make_row_builder(model_cls)
+    return from_row(obj)
+
+
+# List serializers, built once at import so list endpoints reuse a single
+# compiled core schema for the whole list instead of dispatching per item
+EventListAdapter = TypeAdapter(List[EventResponse])
+ImageListAdapter = TypeAdapter(List[ImageListResponse])
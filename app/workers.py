@@ -0,0 +1,16 @@
+from uvicorn.workers import UvicornWorker
+
+class EchooUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker for gunicorn with the server settings the API runs with
+    Access logging is controlled by gunicorn's accesslog setting (see gunicorn.conf.py)
+    """
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        # Nothing reads the client address, so skip X-Forwarded-* parsing
+        "proxy_headers": False,
+        # Drop the Server and Date response headers
+        "server_header": False,
+        "date_header": False,
+    }
@@ -2,124 +2,127 @@
 """
 Generate PostgreSQL commands for production database setup
 Run this to get copy-paste ready SQL commands
+
+The tables and indexes are compiled from the SQLAlchemy models in app/models.py,
+so this is the single source for the production schema and cannot drift from it.
+Every statement is idempotent, so the output can be re-run against an existing database
 """
+import sys
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.models import Base
 
-def print_db_commands():
-    """Print SQL commands for production database setup"""
-    
-    commands = [
-        "-- Enable pgvector extension",
-        "CREATE EXTENSION IF NOT EXISTS vector;",
-        "",
-        "-- Create Users table", 
-        """CREATE TABLE IF NOT EXISTS users (
-    id SERIAL PRIMARY KEY,
-    username VARCHAR(50) UNIQUE NOT NULL,
-    email VARCHAR(100) UNIQUE,
-    password_hash VARCHAR(255) NOT NULL,
-    selfie_url VARCHAR(500),
-    selfie_cid VARCHAR(100),
-    instagram_url VARCHAR(200),
-    twitter_url VARCHAR(200),
-    linkedin_url VARCHAR(200),
-    description TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);""",
-        "",
-        "-- Create Images table (nullable user_id)",
-        """CREATE TABLE IF NOT EXISTS images (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    user_id INTEGER,
-    fotoowl_id INTEGER,
-    fotoowl_url VARCHAR(500),
-    filecoin_url VARCHAR(500),
-    filecoin_cid VARCHAR(100),
-    size INTEGER,
-    description TEXT,
-    image_encoding VARCHAR(50),
-    event_id INTEGER,
-    description_vector vector(512),
-    image_vector vector(512),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    CONSTRAINT fk_images_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-);""",
-        "",
-        "-- Create Events table",
-        """CREATE TABLE IF NOT EXISTS events (
-    id SERIAL PRIMARY KEY,
-    fotoowl_event_id INTEGER UNIQUE NOT NULL,
-    fotoowl_event_key VARCHAR(100),
-    name VARCHAR(255) NOT NULL,
-    description TEXT,
-    cover_image_url VARCHAR(500),
-    event_date DATE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);""",
-        "",
-        "-- Create Event Request Mapping table",
-        """CREATE TABLE IF NOT EXISTS event_request_mapping (
-    id SERIAL PRIMARY KEY,
-    fotoowl_event_id INTEGER NOT NULL,
-    request_id INTEGER NOT NULL,
-    request_key VARCHAR(100),
-    user_id INTEGER NOT NULL,
-    redirect_url VARCHAR(500),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    CONSTRAINT fk_event_mapping_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    CONSTRAINT fk_event_mapping_event FOREIGN KEY (fotoowl_event_id) REFERENCES events(fotoowl_event_id) ON DELETE CASCADE,
-    CONSTRAINT unique_user_event UNIQUE (user_id, fotoowl_event_id)
-);""",
-        "",
-        "-- Create performance indexes",
-        "CREATE INDEX IF NOT EXISTS idx_images_user_id ON images(user_id);",
-        "CREATE INDEX IF NOT EXISTS idx_images_fotoowl_id ON images(fotoowl_id);",
-        "CREATE INDEX IF NOT EXISTS idx_images_event_id ON images(event_id);", 
-        "CREATE INDEX IF NOT EXISTS idx_images_created_at ON images(created_at);",
-        "CREATE INDEX IF NOT EXISTS idx_events_fotoowl_event_id ON events(fotoowl_event_id);",
-        "CREATE INDEX IF NOT EXISTS idx_event_mapping_user_id ON event_request_mapping(user_id);",
-        "CREATE INDEX IF NOT EXISTS idx_event_mapping_fotoowl_event_id ON event_request_mapping(fotoowl_event_id);",
-        "",
-        "-- Create updated_at trigger function",
-        """CREATE OR REPLACE FUNCTION update_updated_at_column()
+_dialect = postgresql.dialect()
+
+def _compile(ddl) -> str:
+    return str(ddl.compile(dialect=_dialect)).strip() + ";"
+
+def _is_hnsw(index) -> bool:
+    return index.dialect_options["postgresql"]["using"] == "hnsw"
+
+_tables = Base.metadata.sorted_tables
+_indexes = [index for table in _tables for index in sorted(table.indexes, key=lambda index: index.name)]
+
+# Changes to existing databases that CREATE ... IF NOT EXISTS cannot make. They run
+# after the tables exist and before the indexes are created, and are safe to re-run
+UPGRADE_COMMANDS = (
+    "-- images.image_url: generated serving URL (added as VARCHAR(255) on some databases)",
+    "ALTER TABLE images ADD COLUMN IF NOT EXISTS image_url TEXT "
+    "GENERATED ALWAYS AS (COALESCE(NULLIF(filecoin_url, ''), fotoowl_url)) STORED;",
+    "ALTER TABLE images ALTER COLUMN image_url TYPE TEXT;",
+    "",
+    "-- event_request_mapping: one registration per user and event; keep the earliest so",
+    "-- uq_erm_user_event (the ON CONFLICT target of event registration) can be built",
+    """DELETE FROM event_request_mapping a
+    USING event_request_mapping b
+    WHERE a.user_id = b.user_id
+      AND a.fotoowl_event_id = b.fotoowl_event_id
+      AND a.id > b.id;""",
+    "",
+    "-- fotoowl_request_mapping: one row per (event, index, request), the ON CONFLICT",
+    "-- target of the bulk insert; keep the earliest before building the unique index",
+    """DELETE FROM fotoowl_request_mapping a
+    USING fotoowl_request_mapping b
+    WHERE a.fotoowl_event_id = b.fotoowl_event_id
+      AND a.fotoowl_index_num = b.fotoowl_index_num
+      AND a.fotoowl_request_id = b.fotoowl_request_id
+      AND a.id > b.id;""",
+    "",
+    "-- user_insta_posts: one row per user and post code, the ON CONFLICT target of",
+    "-- Instagram sync; keep the earliest before building the unique index",
+    """DELETE FROM user_insta_posts a
+    USING user_insta_posts b
+    WHERE a.user_id = b.user_id
+      AND a.code = b.code
+      AND a.id > b.id;""",
+    "",
+    "-- fotoowl_request_mapping: the covering (event, index) index duplicated the table;",
+    "-- uq_fotoowl_request_mapping_event_index_request serves the per-event listing",
+    "DROP INDEX IF EXISTS ix_fotoowl_request_mapping_event_index;",
+)
+
+SETUP_COMMANDS = (
+    "-- Enable pgvector extension",
+    "CREATE EXTENSION IF NOT EXISTS vector;",
+    "",
+    "-- Create tables",
+    *(_compile(CreateTable(table, if_not_exists=True)) for table in _tables),
+    "",
+    "-- Bring existing tables up to date",
+    *UPGRADE_COMMANDS,
+    "",
+    "-- Create indexes",
+    *(_compile(CreateIndex(index, if_not_exists=True)) for index in _indexes if not _is_hnsw(index)),
+    "",
+    "-- Create HNSW indexes for vector similarity search (cosine distance, <=>)",
+    "SET maintenance_work_mem = '2GB';",
+    *(_compile(CreateIndex(index, if_not_exists=True)) for index in _indexes if _is_hnsw(index)),
+    "RESET maintenance_work_mem;",
+    "",
+    "-- Create updated_at trigger function",
+    """CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
 BEGIN
     NEW.updated_at = CURRENT_TIMESTAMP;
     RETURN NEW;
 END;
 $$ language 'plpgsql';""",
-        "",
-        "-- Create updated_at triggers",
-        "DROP TRIGGER IF EXISTS update_users_updated_at ON users;",
-        "CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();",
-        "",
-        "DROP TRIGGER IF EXISTS update_images_updated_at ON images;", 
-        "CREATE TRIGGER update_images_updated_at BEFORE UPDATE ON images FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();",
-        "",
-        "DROP TRIGGER IF EXISTS update_events_updated_at ON events;",
-        "CREATE TRIGGER update_events_updated_at BEFORE UPDATE ON events FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();",
-        "",
-        "-- Verify tables created",
-        "SELECT tablename FROM pg_tables WHERE schemaname = 'public' ORDER BY tablename;"
-    ]
+    "",
+    "-- Create updated_at triggers",
+    *(
+        command
+        for table in _tables if "updated_at" in table.c
+        for command in (
+            f"DROP TRIGGER IF EXISTS update_{table.name}_updated_at ON {table.name};",
+            f"CREATE TRIGGER update_{table.name}_updated_at BEFORE UPDATE ON {table.name} "
+            "FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();",
+        )
+    ),
+    "",
+    "-- Verify tables created",
+    "SELECT tablename FROM pg_tables WHERE schemaname = 'public' ORDER BY tablename;"
+)
+
+# Joined once at import; also usable directly by provisioning scripts
+SQL_SETUP = "\n".join(SETUP_COMMANDS)
+
+def print_db_commands():
+    """Print SQL commands for production database setup"""
     
     print("=== PRODUCTION DATABASE SETUP COMMANDS ===")
     print("Copy and paste these into your production psql terminal:")
     print("")
     
-    for command in commands:
-        print(command)
+    sys.stdout.write(SQL_SETUP)
+    sys.stdout.write("\n")
     
     print("\n=== END OF COMMANDS ===")
     print("\nDatabase tables will be created with:")
     print("✅ pgvector extension enabled")
-    print("✅ All required tables (users, images, events, event_request_mapping)")
-    print("✅ Foreign key constraints and indexes")
+    print(f"✅ All required tables ({', '.join(table.name for table in _tables)})")
+    print("✅ Unique and composite indexes from app/models.py")
+    print("✅ HNSW indexes on image and description vectors")
     print("✅ Auto-updating updated_at timestamps")
-    print("✅ Nullable user_id in images table")
 
 if __name__ == "__main__":
     print_db_commands()
\ No newline at end of file
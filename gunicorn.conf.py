@@ -0,0 +1,45 @@
+"""
+Gunicorn settings for the Echoo API, loaded by run.py in every environment
+"""
+import os
+import subprocess
+import sys
+
+# Environment-based settings
+environment = os.getenv("ENVIRONMENT", "development")
+debug = environment == "development"
+
+bind = "0.0.0.0:8000"
+
+# One worker process per core outside development; reload needs a single worker
+workers = 1 if debug else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = "app.workers.EchooUvicornWorker"
+
+# Outside development the app is imported once in the master and the forked workers
+# share the loaded modules copy-on-write; development reloads workers on code changes,
+# which only works when the master has not imported the app
+preload_app = not debug
+reload = debug
+
+loglevel = "debug" if debug else "info"
+errorlog = "-"
+# Per-request access log lines only in development; the ingress logs requests
+accesslog = "-" if debug else None
+
+def on_starting(server):
+    """Create missing database tables once, in the master, before any worker starts"""
+    if server.cfg.preload_app:
+        from app.main import create_missing_tables
+        from app.database import engine
+        create_missing_tables()
+        # Workers must not inherit the master's pooled connection
+        engine.dispose()
+    else:
+        # Keep the app out of the master so reloaded workers import fresh code
+        subprocess.run(
+            [sys.executable, "-c", "from app.main import create_missing_tables; create_missing_tables()"],
+            check=True
+        )
+
+def when_ready(server):
+    server.log.info("Starting Echoo API on %s (environment: %s, workers: %d)", bind, environment, workers)
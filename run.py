@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """
-Simple script to run the Echoo FastAPI application locally
+Run the Echoo FastAPI application with gunicorn and uvicorn workers
+This is the single entrypoint for local development and the container;
+server settings live in gunicorn.conf.py
 """
-import uvicorn
 import os
 
 if __name__ == "__main__":
-    # Load environment variables from .env file if it exists
+    # Load environment variables from .env file if it exists, so gunicorn.conf.py
+    # and the workers see them
     try:
         from dotenv import load_dotenv
         load_dotenv()
@@ -14,22 +16,5 @@ if __name__ == "__main__":
     except ImportError:
         print("python-dotenv not installed, skipping .env file")
     
-    # Hardcoded configuration (non-sensitive)
-    host = "0.0.0.0"
-    port = 8000
-    
-    # Environment-based settings
-    environment = os.getenv("ENVIRONMENT", "development")
-    debug = environment == "development"
-    
-    print(f"Starting Echoo API on {host}:{port}")
-    print(f"Environment: {environment}")
-    print(f"Debug mode: {debug}")
-    
-    uvicorn.run(
-        "app.main:app",
-        host=host,
-        port=port,
-        reload=debug,
-        log_level="info" if not debug else "debug"
-    )
\ No newline at end of file
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+    os.execvp("gunicorn", ["gunicorn", "--config", config_path, "app.main:app"])